@@ -4,8 +4,8 @@ import subprocess
 import os
 import pandas as pd
 import numpy as np
-import re
 from tqdm import tqdm
+from lshape.solver_log import parse_solver_output
 
 param_grid = {
     '--ands': [1, 0],
@@ -29,33 +29,72 @@ combinations = list(itertools.product(*(param_grid[key] for key in keys)))
 input_cnf = "lshape_20_3.cnf"
 time_limit = 500
 num_workers = 8
-print(f"Number of workers: {num_workers}")
 
-def run_kissat(combo):
+def run_kissat(combo, time_limit=time_limit, cnf=input_cnf, on_start=None):
+    """
+    Run Kissat with one parameter combination.
+
+    Kissat is started in its own process group, so a caller can stop it (and
+    anything it spawned) with os.killpg. on_start, if given, is called with the
+    Popen object as soon as the process exists.
+
+    Parameters:
+        combo (tuple): One value per key of param_grid, in order.
+        time_limit (int): Kissat --time limit in seconds.
+        cnf (str): Input CNF file.
+        on_start (callable): Optional callback receiving the process.
+
+    Returns:
+        dict: The parameters, 'runtime' (process-time in seconds, None if not
+        reported), 'return_code' (10 SAT, 20 UNSAT, 0 time limit, -1 error)
+        and 'stats', every statistic of the log (see lshape.solver_log).
+    """
     params = dict(zip(keys, combo))
-    param_str = " ".join(f"{key}={value}" for key, value in params.items())
-    command = f"kissat/build/kissat --time={time_limit} {param_str} {input_cnf}"
+    command = ["kissat/build/kissat", f"--time={time_limit}"]
+    command += [f"{key}={value}" for key, value in params.items()] + [cnf]
 
     try:
-        result = subprocess.run(command, shell=True, capture_output=True, text=True)
-        stdout = result.stdout + result.stderr
-        match = re.search(r"process-time:.*?([0-9.]+)\s+seconds", stdout)
-        runtime = float(match.group(1)) if match else None
-        print(f"Runtime: {runtime}, Return code: {result.returncode}")
-        return {**params, 'runtime': runtime, 'return_code': result.returncode}
+        proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                text=True, start_new_session=True)
+        if on_start is not None:
+            on_start(proc)
+        stdout, _ = proc.communicate()
+        result = parse_solver_output(stdout, proc.returncode)
+        print(f"Runtime: {result.time}, Return code: {proc.returncode}, Conflicts/sec: {result.conflicts_per_sec}")
+        return {**params, 'runtime': result.time, 'return_code': proc.returncode, 'stats': result.to_dict()}
     except Exception as e:
         return {**params, 'runtime': None, 'return_code': -1}
 
-# Parallel execution with progress bar
-results = []
-with ThreadPoolExecutor(max_workers=num_workers) as executor:
-    futures = [executor.submit(run_kissat, combo) for combo in combinations]
-    for f in tqdm(as_completed(futures), total=len(futures), desc="Parallel grid search"):
-        results.append(f.result())
-
-# Save results
-df = pd.DataFrame(results)
-df.to_csv("runtime_grid_search_20.csv", index=False)
-np.save("runtime_grid_search_20.npy", df.to_numpy())
-print("Saved runtime results")
+if __name__ == "__main__":
+    from run_store import RunStore, params_key
+
+    print(f"Number of workers: {num_workers}")
+
+    # Every finished run is committed to the store, so a restarted job skips it
+    store = RunStore("runs.sqlite")
+    instance = store.instance(input_cnf)
+    finished = store.finished(instance, time_limit)
+    todo = [combo for combo in combinations if params_key(dict(zip(keys, combo))) not in finished]
+    print(f"{len(combinations) - len(todo)} of {len(combinations)} combinations already in the store")
+
+    # Parallel execution with progress bar
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        futures = [executor.submit(run_kissat, combo) for combo in todo]
+        for f in tqdm(as_completed(futures), total=len(futures), desc="Parallel grid search"):
+            res = f.result()
+            if res['return_code'] == -1:
+                continue  # could not run, try again on restart
+            store.record(instance, {key: res[key] for key in keys}, time_limit, res['runtime'],
+                         res['return_code'], stats=res.get('stats'), cnf=input_cnf)
+
+    # Save results, including the runs of earlier jobs
+    df = store.to_dataframe(instance)
+    if df.empty:
+        # No parameter columns to select before any run has finished
+        print("No finished runs to save")
+    else:
+        df = df[df['time_limit'] == time_limit][keys + ['runtime', 'return_code']]
+        df.to_csv("runtime_grid_search_20.csv", index=False)
+        np.save("runtime_grid_search_20.npy", df.to_numpy())
+        print("Saved runtime results")
 
@@ -0,0 +1,192 @@
+import numpy as np
+
+
+def grid_key(grid):
+    """
+    Hashable key of a grid, usable for set/dict lookups.
+
+    Parameters:
+        grid: 2D list or array of cell values.
+
+    Returns:
+        tuple: (shape, raw bytes) of the grid as an int8 array.
+    """
+    grid = np.asarray(grid, dtype=np.int8)
+    return grid.shape, grid.tobytes()
+
+
+def rank(signatures):
+    """
+    Replace every signature by the rank of its value among the distinct signatures.
+    """
+    order = {sig: i for i, sig in enumerate(sorted(set(signatures)))}
+    return [order[sig] for sig in signatures]
+
+
+def refine(grid, rows, cols, colors, color_perms):
+    """
+    Refine the ordered partitions of rows, columns and colors until they are equitable.
+
+    A vertex's new label is its old label followed by the sorted multiset of the
+    labels it meets through the grid, so the result only depends on the labels
+    and not on the original numbering.
+
+    Parameters:
+        grid (np.array): N x N grid of 0-based colors.
+        rows, cols, colors (list): Current labels of every row, column and color.
+        color_perms (bool): Whether colors may be permuted (otherwise colors are fixed).
+
+    Returns:
+        tuple: The refined (rows, cols, colors) labels.
+    """
+    N = grid.shape[0]
+    num_classes = None
+    while True:
+        rows = rank([(rows[r], tuple(sorted((cols[c], colors[grid[r, c]]) for c in range(N))))
+                     for r in range(N)])
+        cols = rank([(cols[c], tuple(sorted((rows[r], colors[grid[r, c]]) for r in range(N))))
+                     for c in range(N)])
+        if color_perms:
+            cells = [[] for _ in colors]
+            for r in range(N):
+                for c in range(N):
+                    cells[grid[r, c]].append((rows[r], cols[c]))
+            colors = rank([(colors[v], tuple(sorted(cells[v]))) for v in range(len(colors))])
+        count = len(set(rows)) + len(set(cols)) + len(set(colors))
+        if count == num_classes:
+            return rows, cols, colors
+        num_classes = count
+
+
+def individualize(labels, x):
+    """
+    Split x off from its class, placing it before the other members.
+    """
+    labels = [2 * label + 1 for label in labels]
+    labels[x] -= 1
+    return labels
+
+
+def target_class(labels):
+    """
+    Members of the first (lowest label) class with more than one member, or None.
+    """
+    counts = {}
+    for label in labels:
+        counts[label] = counts.get(label, 0) + 1
+    split = [label for label, count in counts.items() if count > 1]
+    if not split:
+        return None
+    first = min(split)
+    return [x for x, label in enumerate(labels) if label == first]
+
+
+def orbit(x, which, automorphisms):
+    """
+    Orbit of row, column or color x (which = 0, 1, 2) under the group generated by automorphisms.
+    """
+    seen = {x}
+    frontier = [x]
+    while frontier:
+        y = frontier.pop()
+        for gamma in automorphisms:
+            z = int(gamma[which][y])
+            if z not in seen:
+                seen.add(z)
+                frontier.append(z)
+    return seen
+
+
+def invariant(grid, rows, cols, colors):
+    """
+    Node invariant of a refined partition: the number of cells of every color class in every (row class, column class) block.
+    """
+    N, C = grid.shape[0], len(colors)
+    block = (np.asarray(rows)[:, None] * N + np.asarray(cols)[None, :]) * C + np.asarray(colors)[grid]
+    return np.bincount(block.ravel(), minlength=N * N * C).tobytes()
+
+
+def search(grid, rows, cols, colors, color_perms, state, path=(), trace=()):
+    """
+    Individualization-refinement search for the leaf with the smallest (trace, certificate).
+
+    The trace is the sequence of node invariants on the path to a leaf, so a
+    subtree whose trace is already larger than that of the best leaf is
+    skipped. Two leaves with the same certificate give an automorphism of the
+    grid; the search then jumps back to the node where their paths split, as
+    the rest of the current subtree is an image of one already explored, and
+    at every node children in the same orbit under the automorphisms fixing
+    its path are only explored once.
+
+    Parameters:
+        state (dict): The 'best' (trace, certificate), the 'leaves' and the
+            'automorphisms' found so far, shared by the whole search.
+        path (tuple): (which, x) pairs individualized so far (which = 0, 1, 2 for rows, columns, colors).
+        trace (tuple): Node invariants of the ancestors.
+
+    Returns:
+        int or None: Depth to jump back to, if an automorphism was found.
+    """
+    rows, cols, colors = refine(grid, rows, cols, colors, color_perms)
+    labels = (rows, cols, colors)
+    trace = trace + (invariant(grid, *labels),)
+    if state["best"] is not None and trace > state["best"][0][:len(trace)]:
+        return None
+    # Colors first: at most C! branches, and distinguished colors refine the rows and columns much further
+    for which in (2, 0, 1):
+        members = target_class(labels[which])
+        if members is None:
+            continue
+        depth = len(path)
+        explored = []
+        for x in members:
+            stabilizer = [gamma for gamma in state["automorphisms"] if all(gamma[w][y] == y for w, y in path)]
+            if stabilizer and not orbit(x, which, stabilizer).isdisjoint(explored):
+                continue
+            branch = list(labels)
+            branch[which] = individualize(labels[which], x)
+            jump = search(grid, *branch, color_perms, state, path + ((which, x),), trace)
+            explored.append(x)
+            if jump is not None and jump < depth:
+                return jump
+        return None
+
+    # Every row, column and color is now distinguished: relabel the grid
+    canon = np.empty_like(grid)
+    canon[np.ix_(rows, cols)] = np.asarray(colors)[grid]
+    leaf = canon.tobytes()
+    if state["best"] is None or (trace, leaf) < state["best"]:
+        state["best"] = (trace, leaf)
+    first = state["leaves"].setdefault(leaf, labels)
+    if first is labels:
+        return None
+    # Map every row, column and color of this leaf to the one with the same label in the first leaf
+    gamma = tuple(np.argsort(a)[np.asarray(b)] for a, b in zip(first, labels))
+    state["automorphisms"].append(gamma)
+    return next(i for i, (w, y) in enumerate(path) if gamma[w][y] != y)
+
+
+def canonical_form(grid, C=None, color_perms=True):
+    """
+    Canonical form of a colored grid under row, column and (optionally) color permutations.
+
+    Two grids get the same canonical form exactly when one can be turned into the
+    other by permuting its rows, its columns and, if color_perms is set, its colors.
+    Solutions can therefore be deduplicated with a set of canonical forms.
+
+    Parameters:
+        grid: N x N grid (2D list or array) with values in 1..C.
+        C (int): Number of colors; defaults to the largest value in the grid.
+        color_perms (bool): Also quotient by permutations of the colors.
+
+    Returns:
+        tuple: Hashable canonical form (N, C, canonical grid bytes).
+    """
+    grid = np.asarray(grid, dtype=np.int8) - 1
+    N = grid.shape[0]
+    C = int(grid.max()) + 1 if C is None else C
+    rows, cols = [0] * N, [0] * N
+    colors = [0] * C if color_perms else list(range(C))
+    state = {"best": None, "leaves": {}, "automorphisms": []}
+    search(grid, rows, cols, colors, color_perms, state)
+    return N, C, state["best"][1]
@@ -0,0 +1,181 @@
+import numpy as np
+from pysat.solvers import Solver
+from .dimacs import DimacsWriter, iter_dimacs, read_header
+
+
+class CNF:
+    """
+    A compact clause store shared by every encoder.
+
+    Every literal of every clause is kept in one flat int32 buffer `lits`, and
+    clause i spans lits[offsets[i]:offsets[i + 1]]. Clauses are added in whole
+    blocks (2D arrays where each row is one clause) so encoders never have to
+    build a Python list per clause; single clauses appended with append() are
+    buffered and packed into the arrays on the next access.
+
+    The same store can be written to a DIMACS file (to_file), loaded into a
+    PySAT solver (add_to / solver) or converted to an LP without re-encoding.
+    """
+
+    def __init__(self, num_vars=0):
+        self.num_vars = num_vars
+        self._lits = np.zeros(0, dtype=np.int32)
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._pending = []
+
+    @classmethod
+    def from_blocks(cls, num_vars, blocks):
+        """
+        Build a store from a sequence of clause blocks.
+
+        Parameters:
+            num_vars (int): Number of variables in the formula.
+            blocks (iterable): 2D integer arrays, one clause per row.
+
+        Returns:
+            CNF: The clause store.
+        """
+        cnf = cls(num_vars)
+        cnf.add_blocks(blocks)
+        return cnf
+
+    @classmethod
+    def from_lists(cls, num_vars, clauses):
+        """
+        Build a store from a list of clauses given as lists of literals.
+        """
+        cnf = cls(num_vars)
+        cnf._pending = [list(clause) for clause in clauses]
+        return cnf
+
+    @classmethod
+    def from_file(cls, filename, chunk_size=1 << 24):
+        """
+        Load a DIMACS CNF file through the memory-mapped chunked reader.
+
+        Parameters:
+            filename (str): DIMACS CNF file.
+            chunk_size (int): Approximate number of bytes parsed at once.
+
+        Returns:
+            CNF: The clause store.
+        """
+        cnf = cls(read_header(filename)[0])
+        lits, offsets = [cnf._lits], [cnf._offsets]
+        for chunk_lits, chunk_offsets in iter_dimacs(filename, chunk_size):
+            lits.append(chunk_lits)
+            offsets.append(offsets[-1][-1] + chunk_offsets[1:])
+        cnf._lits = np.concatenate(lits)
+        cnf._offsets = np.concatenate(offsets)
+        return cnf
+
+    @property
+    def lits(self):
+        self._pack()
+        return self._lits
+
+    @property
+    def offsets(self):
+        self._pack()
+        return self._offsets
+
+    def _pack(self):
+        """
+        Move the clauses buffered by append() into the flat arrays.
+        """
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        lengths = np.fromiter((len(clause) for clause in pending), dtype=np.int64, count=len(pending))
+        lits = np.fromiter((lit for clause in pending for lit in clause), dtype=np.int32, count=int(lengths.sum()))
+        self._lits = np.concatenate([self._lits, lits])
+        self._offsets = np.concatenate([self._offsets, self._offsets[-1] + np.cumsum(lengths)])
+
+    def append(self, clause):
+        """
+        Append a single clause given as a sequence of literals.
+        """
+        self._pending.append(clause)
+
+    def add_blocks(self, blocks):
+        """
+        Append clause blocks (2D arrays, one clause per row) to the store.
+        """
+        self._pack()
+        lits = [self._lits]
+        lengths = []
+        for block in blocks:
+            block = np.asarray(block, dtype=np.int32)
+            if block.size == 0:
+                continue
+            lits.append(block.ravel())
+            lengths.append(np.full(block.shape[0], block.shape[1], dtype=np.int64))
+        if not lengths:
+            return
+        self._lits = np.concatenate(lits)
+        lengths = np.concatenate(lengths)
+        self._offsets = np.concatenate([self._offsets, self._offsets[-1] + np.cumsum(lengths)])
+
+    def extend(self, other):
+        """
+        Append all clauses of another store; num_vars becomes the larger of the two.
+        """
+        self._pack()
+        self._lits = np.concatenate([self._lits, other.lits])
+        self._offsets = np.concatenate([self._offsets, self._offsets[-1] + other.offsets[1:]])
+        self.num_vars = max(self.num_vars, other.num_vars)
+
+    def __add__(self, other):
+        merged = CNF(self.num_vars)
+        merged.extend(self)
+        merged.extend(other)
+        return merged
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def clause(self, i):
+        """
+        Return clause i as an int32 array view into the literal buffer.
+        """
+        return self.lits[self.offsets[i]:self.offsets[i + 1]]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.clause(i)
+
+    def to_lists(self):
+        """
+        Return the clauses as a list of lists of Python ints.
+
+        Returns:
+            list of lists: One list of literals per clause.
+        """
+        lits = self.lits.tolist()
+        offsets = self.offsets.tolist()
+        return [lits[offsets[i]:offsets[i + 1]] for i in range(len(self))]
+
+    def to_file(self, filename, chunk_size=65536):
+        """
+        Write the formula to a DIMACS CNF file in chunks.
+        """
+        with DimacsWriter(filename, self.num_vars, num_clauses=len(self), chunk_size=chunk_size) as writer:
+            writer.add_cnf(self)
+
+    def add_to(self, solver):
+        """
+        Load every clause into a PySAT solver with one call.
+        """
+        solver.append_formula(self.to_lists())
+
+    def solver(self, name="glucose3"):
+        """
+        Create a PySAT solver bootstrapped with the formula.
+
+        Parameters:
+            name (str): PySAT solver name, e.g. "glucose3", "cadical153".
+
+        Returns:
+            pysat.solvers.Solver: The solver.
+        """
+        return Solver(name=name, bootstrap_with=self.to_lists())
@@ -1,9 +1,19 @@
-from gurobipy import Model, GRB
+import numpy as np
+from .cnf import CNF
+from .lp_export import clause_matrix, write_model
+
+try:
+    from gurobipy import Model, GRB, LinExpr
+except ImportError:  # the matrix writer below does not need Gurobi
+    Model = GRB = LinExpr = None
 
 def cnf_to_lp(cnf_file, lp_file):
     """
     Convert a CNF file in DIMACS format to an equivalent Linear Programming (LP)
     formulation that can be solved by Gurobi.
+
+    cnf_file may be a DIMACS filename, which is read with the memory-mapped
+    chunked parser, or a CNF clause store produced by one of the encoders.
     
     1. **Variable Creation**:
        - Each Boolean variable x_i in the CNF is mapped to a binary variable in the LP
@@ -23,64 +33,58 @@ def cnf_to_lp(cnf_file, lp_file):
          
          This constraint ensures that at least one literal in the clause is True.
     """
-    with open(cnf_file, 'r') as f:
-        lines = f.readlines()
-
-    model = Model("SAT_to_LP")
-
-    variables = set()
-    constraints = []
-
-    # Parse the CNF file
-    for line in lines:
-        line = line.strip()
-        if line.startswith('p cnf'):
-            _, _, num_vars, _ = line.split()
-            num_vars = int(num_vars)
-            continue
-        if line.startswith('c') or line == "":
-            continue  # Skip comments and empty lines
-
-        # Parse clauses (space-separated literals, ending with '0')
-        literals = list(map(int, line.split()))[:-1]  # Remove trailing 0
-        clause_terms = []
+    if Model is None:
+        raise ImportError("cnf_to_lp requires gurobipy, use cnf_to_lp_matrix to write the LP without it")
 
-        for lit in literals:
-            var = abs(lit)
-            variables.add(var)
-            
-            if lit > 0:
-                clause_terms.append(f"x{var}")
-            else:
-                clause_terms.append(f"(1 - x{var})")
+    # Parse the CNF file into flat literal arrays (or take an in-memory CNF as is)
+    cnf = cnf_file if isinstance(cnf_file, CNF) else CNF.from_file(cnf_file)
 
-        constraints.append(" + ".join(clause_terms) + " >= 1")
+    model = Model("SAT_to_LP")
 
-    # Define variables in Gurobi as binary
+    # Define variables in Gurobi as binary, for every variable that occurs in a clause
+    variables = np.unique(np.abs(cnf.lits)).tolist()
     x = {i: model.addVar(vtype=GRB.BINARY, name=f"x{i}") for i in variables}
     model.update()  # Ensure variables are recognized
 
-    # Add constraints properly
-    for c in constraints:
-        # Remove the trailing ' >= 1'
-        clause_str = c.replace(" >= 1", "")
-        terms = clause_str.split(" + ")
-        lhs = 0  # Left-hand side of inequality
-        
-        for term in terms:
-            if term.startswith("(1 - x"):
-                var_index = int(term.split("x")[1].split(")")[0])
-                lhs += (1 - x[var_index])
-            else:
-                var_index = int(term.replace("x", ""))
-                lhs += x[var_index]
-        
-        model.addConstr(lhs >= 1)
+    # Add constraints properly: sum(x_pos) + sum(1 - x_neg) >= 1,
+    # i.e. sum(x_pos) - sum(x_neg) >= 1 - (number of negative literals)
+    lits = cnf.lits.tolist()
+    offsets = cnf.offsets.tolist()
+    for i in range(len(cnf)):
+        clause = lits[offsets[i]:offsets[i + 1]]
+        coeffs = [1.0 if lit > 0 else -1.0 for lit in clause]
+        num_negative = sum(1 for lit in clause if lit < 0)
+        lhs = LinExpr(coeffs, [x[abs(lit)] for lit in clause])
+        model.addConstr(lhs >= 1 - num_negative)
 
     # Write to LP file
     model.update()
     model.write(lp_file)
     print(f"LP file saved: {lp_file}")
 
-cnf_to_lp("single_color.cnf", "single_color.lp")
 
+def cnf_to_lp_matrix(cnf_file, lp_file, use_gurobi=False, chunk_size=65536):
+    """
+    Convert a CNF to the same LP model as cnf_to_lp, without building one Gurobi
+    expression per clause.
+
+    The clauses are turned into a SciPy sparse matrix directly from the flat
+    literal buffer (+1 for a positive literal, -1 for a negative one, right-hand
+    side 1 - number of negative literals). By default the matrix is streamed to
+    an LP or MPS file (chosen by the extension of lp_file) without Gurobi; with
+    use_gurobi=True it is handed to Gurobi's matrix API (addMVar / addMConstr)
+    and written by Gurobi instead.
+
+    Parameters:
+        cnf_file (str or CNF): DIMACS filename or in-memory clause store.
+        lp_file (str): Output ".lp" or ".mps" file.
+        use_gurobi (bool): Build the model with gurobipy instead of the text writer.
+        chunk_size (int): Rows (or columns, for MPS) formatted per write.
+    """
+    cnf = cnf_file if isinstance(cnf_file, CNF) else CNF.from_file(cnf_file)
+    A, b = clause_matrix(cnf)
+    write_model(A, b, lp_file, use_gurobi=use_gurobi, chunk_size=chunk_size)
+    print(f"LP file saved: {lp_file}")
+
+if __name__ == "__main__":
+    cnf_to_lp("single_color.cnf", "single_color.lp")
@@ -0,0 +1,213 @@
+import json
+import os
+import signal
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from tqdm import tqdm
+from .fix_subshape import enumerate_prefixes, lshape_to_cnf, var
+from .solver_log import parse_solver_output
+from .verify import verify_model
+
+# Standard exit codes of DIMACS solvers (Kissat, CaDiCaL, parkissat, Glucose)
+SAT_EXIT = 10
+UNSAT_EXIT = 20
+
+
+def enumerate_cubes(k, C, symmetry_breaking=("colors",)):
+    """
+    Enumerate the cubes of a cube-and-conquer split: every valid coloring of
+    the top-left k x k corner.
+
+    Every L-shape of the corner is an L-shape of the full grid, so corner
+    colorings with a monochromatic L-shape can never extend and are skipped.
+    By default colors are numbered by first occurrence, which keeps one cube
+    per color class (the L-shape problem is symmetric under color permutations).
+
+    Parameters:
+        k (int): Size of the corner subgrid.
+        C (int): Number of colors.
+        symmetry_breaking (iterable): Symmetry kinds to break, "colors" or none (see lshape_cnf).
+
+    Returns:
+        list: One cube per corner coloring, as a list of (r, c, v) tuples.
+    """
+    return enumerate_prefixes(k, C, symmetry_breaking=symmetry_breaking)
+
+
+def cube_literals(cube, N, C):
+    """
+    The sorted DIMACS literals of a cube, which identify it in a checkpoint.
+    """
+    return sorted(var(r, c, v, N, C) for (r, c, v) in cube)
+
+
+def load_checkpoint(path, settings):
+    """
+    Load the finished cubes of an earlier run, {cube literals (tuple): {"status": ..., "model": ...}}.
+
+    Cubes are keyed by their literals, not by their position in the
+    enumeration, and the checkpoint must have been written with the same
+    settings (N, C, k and symmetry breaking). Anything else raises ValueError
+    rather than risk skipping a cube that was never solved, which could turn
+    into a false UNSAT.
+
+    Parameters:
+        path (str): Checkpoint file (None for no checkpoint).
+        settings (dict): Settings of the current run.
+    """
+    if path is None or not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        data = json.load(f)
+    saved = {key: data.get(key) for key in settings}
+    if saved != settings:
+        raise ValueError(f"Checkpoint {path} was written for {saved}, not {settings}; "
+                         f"remove it or pass another checkpoint file.")
+    return {tuple(result["cube"]): result for result in data["cubes"]}
+
+
+def save_checkpoint(path, settings, finished):
+    """
+    Atomically write the settings and the finished cubes, so a killed job never leaves a truncated file.
+    """
+    if path is None:
+        return
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({**settings, "cubes": list(finished.values())}, f)
+    os.replace(tmp, path)
+
+
+class CubeRunner:
+    """
+    Solve cubes with an external DIMACS solver, one solver process per cube.
+
+    Each solver runs in its own process group so that the whole group can be
+    signalled when another cube has already been found SAT.
+    """
+
+    def __init__(self, N, C, solver_cmd, workdir):
+        self.N = N
+        self.C = C
+        self.solver_cmd = solver_cmd
+        self.workdir = workdir
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.procs = set()
+
+    def run(self, cube_id, cube):
+        """
+        Solve one cube; returns (cube_id, status, model) with status SAT, UNSAT or UNKNOWN.
+        """
+        if self.stop.is_set():
+            return cube_id, "UNKNOWN", None
+        filename = os.path.join(self.workdir, f"cube_{self.N}_{self.C}_{cube_id}.cnf")
+        lshape_to_cnf(self.N, self.C, fixed_subgrid=cube, filename=filename)
+
+        with self.lock:
+            if self.stop.is_set():
+                os.remove(filename)
+                return cube_id, "UNKNOWN", None
+            proc = subprocess.Popen(self.solver_cmd + [filename], stdout=subprocess.PIPE,
+                                    stderr=subprocess.STDOUT, text=True, start_new_session=True)
+            self.procs.add(proc)
+        output, _ = proc.communicate()
+        with self.lock:
+            self.procs.discard(proc)
+        os.remove(filename)
+
+        result = parse_solver_output(output, proc.returncode)
+        if result.status == "SAT" and result.model is not None:
+            return cube_id, "SAT", result.model.tolist()
+        if result.status == "UNSAT":
+            return cube_id, "UNSAT", None
+        return cube_id, "UNKNOWN", None
+
+    def cancel(self):
+        """
+        Stop dispatching new cubes and terminate every running solver.
+        """
+        with self.lock:
+            self.stop.set()
+            for proc in self.procs:
+                try:
+                    os.killpg(proc.pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+
+
+def cube_and_conquer(N, C, k=3, solver_cmd=("kissat/build/kissat", "-q"), num_workers=os.cpu_count(),
+                     checkpoint=None, workdir=".", symmetry_breaking=("colors",)):
+    """
+    Solve the N x N L-shape problem by splitting it on the coloring of a k x k corner.
+
+    The cubes are encoded with fix_subshape.lshape_to_cnf(fixed_subgrid=...) and
+    dispatched to num_workers concurrent solver processes. As soon as one cube is
+    SAT the remaining ones are cancelled. Finished cubes are recorded in the
+    checkpoint file after each result, with their literals and the run's
+    settings, and skipped when the run is resumed with the same settings.
+
+    Parameters:
+        N (int): Grid dimension.
+        C (int): Number of colors.
+        k (int): Size of the corner subgrid that defines the cubes.
+        solver_cmd (sequence): Solver command; the CNF filename is appended.
+        num_workers (int): Number of solver processes running at once.
+        checkpoint (str): Optional JSON file recording finished cubes.
+        workdir (str): Directory for the temporary cube CNF files.
+        symmetry_breaking (iterable): Symmetry kinds broken in the cube enumeration, see enumerate_cubes.
+
+    Returns:
+        list or None: A verified SAT model, or None if every cube is UNSAT
+        (or some cube stayed UNKNOWN).
+    """
+    cubes = enumerate_cubes(k, C, symmetry_breaking)
+    settings = {"N": N, "C": C, "k": k, "symmetry_breaking": sorted(symmetry_breaking)}
+    keys = [tuple(cube_literals(cube, N, C)) for cube in cubes]
+    finished = load_checkpoint(checkpoint, settings)
+    unknown = set(finished) - set(keys)
+    if unknown:
+        raise ValueError(f"Checkpoint {checkpoint} holds {len(unknown)} cubes that are not in this enumeration.")
+    for key, result in finished.items():
+        if result["status"] == "SAT":
+            print(f"Cube {list(key)} was already solved SAT.")
+            return result["model"]
+
+    pending = [(cube_id, cube) for cube_id, cube in enumerate(cubes) if keys[cube_id] not in finished]
+    print(f"{len(cubes)} cubes, {len(cubes) - len(pending)} already finished.")
+
+    runner = CubeRunner(N, C, list(solver_cmd), workdir)
+    solution = None
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        futures = [executor.submit(runner.run, cube_id, cube) for cube_id, cube in pending]
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Cube and conquer"):
+            cube_id, status, model = future.result()
+            if status == "UNKNOWN":
+                continue
+            if status == "SAT" and not verify_model(model, N, C):
+                print(f"Cube {cube_id}: solver model fails verification, ignoring it.")
+                continue
+            finished[keys[cube_id]] = {"cube": list(keys[cube_id]), "status": status, "model": model}
+            save_checkpoint(checkpoint, settings, finished)
+            if status == "SAT":
+                solution = model
+                runner.cancel()
+                for other in futures:
+                    other.cancel()
+                break
+
+    if solution is not None:
+        print("Found a solution.")
+    elif len(finished) == len(cubes):
+        print("All cubes are UNSAT.")
+    else:
+        print(f"{len(cubes) - len(finished)} cubes are still unresolved.")
+    return solution
+
+
+if __name__ == "__main__":
+    N, C = 19, 3
+    model = cube_and_conquer(N, C, k=3, checkpoint=f"cubes_{N}_{C}.json")
+    if model is not None:
+        print(" ".join(map(str, model)))
@@ -1,9 +1,9 @@
-from itertools import combinations
-from tqdm import tqdm
 from pysat.solvers import Glucose3
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.colors as mcolors
+from .cnf import CNF
+from .lshape_to_cnf import lshape_cells
 
 
 def var(r, c, N):
@@ -13,6 +13,57 @@ def var(r, c, N):
     assert 1 <= r <= N and 1 <= c <= N
     return (r - 1) * N + c
 
+def rotate_cells(N):
+    """
+    Return the 90° rotation (r, c) -> (c, N-1-r) of the N x N grid as a map on flat 0-based cells.
+    """
+    r, c = np.divmod(np.arange(N * N), N)
+    return c * N + (N - 1 - r)
+
+
+def rotation_orbits(N):
+    """
+    Enumerate the orbits of the 90° rotation group on the N x N grid.
+
+    Row k of the result lists the flat 0-based cells p, rot(p), rot²(p), rot³(p)
+    of the k-th orbit, where p is the cell of the orbit that comes first in
+    row-major order. For odd N the center cell is its own orbit and is left out.
+
+    Parameters:
+        N (int): The grid dimension.
+
+    Returns:
+        np.array: (num_orbits, 4) array of flat cells.
+    """
+    rot = rotate_cells(N)
+    images = np.empty((N * N, 4), dtype=np.int64)
+    images[:, 0] = np.arange(N * N)
+    for k in range(1, 4):
+        images[:, k] = rot[images[:, k - 1]]
+    # One row per orbit, starting from its smallest cell
+    orbits = images[images[:, 0] == images.min(axis=1)]
+    if N % 2 == 1:
+        orbits = orbits[orbits[:, 0] != (N * N) // 2]
+    return orbits
+
+
+def rotated_lshapes(N):
+    """
+    Enumerate the L-shapes of the N x N grid in all four orientations.
+
+    Orientation 1 is (r, c), (r+i, c), (r+i, c+i) (lshape_to_cnf.lshape_cells);
+    orientations 2, 3 and 4 are its images under 90°, 180° and 270° rotation.
+
+    Returns:
+        np.array: (4 * K, 3) array of flat 0-based cells, orientation by orientation.
+    """
+    rot = rotate_cells(N)
+    shapes = [lshape_cells(N).astype(np.int64)]
+    for _ in range(3):
+        shapes.append(rot[shapes[-1]])
+    return np.concatenate(shapes)
+
+
 def generate_single_color_clauses(N, write=False, filename="single_color.cnf"):
     """
     Generate a DIMACS CNF file for a one-color assignment on an N x N grid.
@@ -32,143 +83,298 @@ def generate_single_color_clauses(N, write=False, filename="single_color.cnf"):
       2. L‑shape avoidance constraints:
          - For each L‑shape of three cells with equal leg length (in four orientations),
            add a clause forbidding all three cells from being colored simultaneously.
+         - An L-shape with two cells in the same orbit is skipped: the
+           at-most-one clause of that orbit already forbids it.
     
     After solving the CNF for the one‑color assignment, one can produce a full
     four‑color assignment by rotating the solution by 90°, 180° and 270°.
     
     Parameters:
        N (int): The grid dimension.
+       write (bool): Whether to also write the formula to filename.
        filename (str): The name of the output DIMACS CNF file.
+
+    Returns:
+       CNF: Clause store holding all clauses.
     """
     num_variables = N * N  # one variable per cell
-    clauses = []
-    clause_count = 0
-    seen = set()
+    blocks = []
 
     # If N is odd, fix the center cell to be colored.
     if N % 2 == 1:
-        center = ((N + 1) // 2, (N + 1) // 2)
-        clauses.append([var(center[0], center[1], N)])
-        clause_count += 1
-        seen.add(center)
+        blocks.append([[(N * N) // 2 + 1]])
 
     # --- 1. Quadruple Constraints ---
-    #
-    # Process each cell (unless already handled, e.g. the fixed center).
-    for r in tqdm(range(1, N + 1), desc="Processing quadruple orbits"):
-        for c in range(1, N + 1):
-            if (r, c) in seen:
-                continue
-            # Compute the orbit (quadruple) under 90° rotations:
-            cell1 = (r, c)
-            cell2 = (c, N + 1 - r)
-            cell3 = (N + 1 - r, N + 1 - c)
-            cell4 = (N + 1 - c, r)
-            orbit = {cell1, cell2, cell3, cell4}
-            for pos in orbit:
-                seen.add(pos)
-            # At least one in the orbit is colored:
-            clause = [var(pos[0], pos[1], N) for pos in orbit]
-            clauses.append(clause)
-            clause_count += 1
-            # At most one: For every pair in the orbit, add a clause that not both are colored.
-            for a, b in combinations(orbit, 2):
-                clauses.append([-var(a[0], a[1], N), -var(b[0], b[1], N)])
-                clause_count += 1
+    orbits = rotation_orbits(N)
+    # At least one in the orbit is colored
+    blocks.append(orbits + 1)
+    # At most one: for every pair in the orbit, not both are colored
+    i, j = np.triu_indices(4, k=1)
+    blocks.append(-(np.stack([orbits[:, i], orbits[:, j]], axis=-1).reshape(-1, 2) + 1))
 
     # --- 2. L-shape Avoidance Constraints ---
-    #
-    # Orientation 1: cells (r, c), (r+i, c), (r+i, c+i)
-    for r in tqdm(range(1, N + 1), desc="L-shape orientation 1"):
-        for c in range(1, N + 1):
-            max_i = min(N - r, N - c)
-            for i in range(1, max_i + 1):
-                clause = [
-                    -var(r, c, N),
-                    -var(r + i, c, N),
-                    -var(r + i, c + i, N)
-                ]
-                clauses.append(clause)
-                clause_count += 1
-
-    # Orientation 2: cells (r, c), (r, c-i), (r+i, c-i)
-    for r in tqdm(range(1, N + 1), desc="L-shape orientation 2"):
-        for c in range(1, N + 1):
-            max_i = min(N - r, c - 1)
-            for i in range(1, max_i + 1):
-                clause = [
-                    -var(r, c, N),
-                    -var(r, c - i, N),
-                    -var(r + i, c - i, N)
-                ]
-                clauses.append(clause)
-                clause_count += 1
-
-    # Orientation 3: cells (r, c), (r-i, c), (r-i, c-i)
-    for r in tqdm(range(1, N + 1), desc="L-shape orientation 3"):
-        for c in range(1, N + 1):
-            max_i = min(r - 1, c - 1)
-            for i in range(1, max_i + 1):
-                clause = [
-                    -var(r, c, N),
-                    -var(r - i, c, N),
-                    -var(r - i, c - i, N)
-                ]
-                clauses.append(clause)
-                clause_count += 1
-
-    # Orientation 4: cells (r, c), (r, c+i), (r-i, c+i)
-    for r in tqdm(range(1, N + 1), desc="L-shape orientation 4"):
-        for c in range(1, N + 1):
-            max_i = min(r - 1, N - c)
-            for i in range(1, max_i + 1):
-                clause = [
-                    -var(r, c, N),
-                    -var(r, c + i, N),
-                    -var(r - i, c + i, N)
-                ]
-                clauses.append(clause)
-                clause_count += 1
+    shapes = rotated_lshapes(N)
+    orbit_id = np.full(N * N, -1, dtype=np.int64)
+    orbit_id[orbits] = np.arange(len(orbits))[:, None]
+    ids = orbit_id[shapes]
+    # The center (odd N) has id -1 and never shares an orbit with another cell
+    redundant = ((ids[:, 0] == ids[:, 1]) | (ids[:, 0] == ids[:, 2]) | (ids[:, 1] == ids[:, 2])) & (ids >= 0).all(axis=1)
+    blocks.append(-(shapes[~redundant] + 1))
 
+    clauses = CNF.from_blocks(num_variables, blocks)
     if write:
-        with open(filename, "w") as f:
-            f.write(f"p cnf {num_variables} {clause_count}\n")
-            for c in clauses:
-                f.write(" ".join(map(str, c)) + " 0\n")
+        clauses.to_file(filename)
     return clauses
 
 
+def rotation(N, quarter_turns=1):
+    """
+    Cell permutation of the rotation by quarter_turns * 90° of the N x N grid (flat 0-based cells).
+    """
+    rot = np.arange(N * N)
+    for _ in range(quarter_turns % 4):
+        rot = rotate_cells(N)[rot]
+    return rot
+
+
+def reflection(N, axis):
+    """
+    Cell permutation of a reflection of the N x N grid.
+
+    Parameters:
+        N (int): The grid dimension.
+        axis (str): "horizontal" (r -> N-1-r), "vertical" (c -> N-1-c),
+            "diagonal" ((r, c) -> (c, r)) or "antidiagonal" ((r, c) -> (N-1-c, N-1-r)).
+    """
+    r, c = np.divmod(np.arange(N * N), N)
+    images = {
+        "horizontal": (N - 1 - r, c),
+        "vertical": (r, N - 1 - c),
+        "diagonal": (c, r),
+        "antidiagonal": (N - 1 - c, N - 1 - r),
+    }
+    if axis not in images:
+        raise ValueError(f"unknown reflection axis {axis!r}")
+    rr, cc = images[axis]
+    return rr * N + cc
+
+
+def translation(N, dr, dc):
+    """
+    Cell permutation of the torus translation (r, c) -> ((r+dr) mod N, (c+dc) mod N).
+    """
+    r, c = np.divmod(np.arange(N * N), N)
+    return (r + dr) % N * N + (c + dc) % N
+
+
+def color_cycle(C, shift=1):
+    """
+    Color permutation v -> v + shift (mod C) on 0-based colors.
+    """
+    return (np.arange(C) + shift) % C
+
+
+def symmetry_orbits(N, C, generators, exempt=()):
+    """
+    Orbit tables of a coloring symmetry.
+
+    The symmetry is given by generators (g, sigma): g a permutation of the
+    flat cells and sigma a permutation of the colors, and a symmetric coloring
+    satisfies color(g(p)) = sigma(color(p)) for every generator. Every cell q
+    then gets its orbit's representative r (the smallest cell of the orbit)
+    and a color permutation perm[q] with color(q) = perm[q][color(r)].
+
+    A representative color v is impossible when two paths from r to the same
+    cell give it different colors (e.g. a cell fixed by a rotation whose color
+    cycle has no fixed point); such pairs are returned in forbidden. Cells in
+    exempt (e.g. the center for odd N) are left out of the symmetry and form
+    their own orbits; the generators must map them among themselves.
+
+    Parameters:
+        N (int): The grid dimension.
+        C (int): Number of colors.
+        generators (list): (cell permutation, color permutation) pairs.
+        exempt (iterable): Flat cells excluded from the symmetry.
+
+    Returns:
+        tuple: (orbit, perm, reps, forbidden). orbit[q] is the index of the
+        orbit of cell q, perm the (N*N, C) color maps, reps the representative
+        cell of each orbit and forbidden a boolean (num_orbits, C) array.
+    """
+    n = N * N
+    active = np.ones(n, dtype=bool)
+    active[list(exempt)] = False
+    generators = [(np.asarray(g), np.asarray(sigma)) for g, sigma in generators]
+
+    # Orbit labels: propagate the smallest cell along the generator edges
+    label = np.arange(n)
+    while True:
+        new = label.copy()
+        for g, _ in generators:
+            np.minimum.at(new, g[active], label[active])
+            new[active] = np.minimum(new[active], new[g[active]])
+        if (new == label).all():
+            break
+        label = new
+    reps, orbit = np.unique(label, return_inverse=True)
+
+    # Color maps: breadth-first from the representatives
+    perm = np.tile(np.arange(C), (n, 1))
+    known = label == np.arange(n)
+    while not known.all():
+        before = known.sum()
+        for g, sigma in generators:
+            step = active & known & ~known[g]
+            perm[g[step]] = sigma[perm[step]]
+            known[g[step]] = True
+        if known.sum() == before:
+            raise ValueError("the generators map cells between exempt and symmetric cells")
+
+    # Consistency on every edge: color(g(q)) must be sigma(color(q)) for all representative colors
+    forbidden = np.zeros((len(reps), C), dtype=bool)
+    for g, sigma in generators:
+        q = np.flatnonzero(active)
+        clash = sigma[perm[q]] != perm[g[q]]
+        np.logical_or.at(forbidden, orbit[q], clash)
+    return orbit, perm, reps, forbidden
+
+
+def symmetric_cnf(N, C, generators, exempt=()):
+    """
+    Encode the symmetric colorings of the N x N grid without a monochromatic
+    L-shape, over the orbit representatives only (the quotient CNF).
+
+    Variable o * C + v + 1 says that the representative of orbit o has color v
+    (0-based); the color of every other cell follows from symmetry_orbits. The
+    clauses are one-hot constraints per orbit, units for the forbidden
+    representative colors, and for every L-shape and color the quotient image
+    of "not all three cells have that color". Many L-shapes have the same
+    image; duplicates, and images with two different colors of one orbit
+    (already excluded by the one-hot constraints), are dropped.
+
+    Examples of symmetries (see rotation, reflection, translation, color_cycle):
+        [(rotation(N), color_cycle(4))]            90° rotation cycling 4 colors
+        [(rotation(N, 2), color_cycle(2))]         180° rotation swapping 2 colors
+        [(reflection(N, "diagonal"), color_cycle(2))]
+        [(translation(N, 0, 1), color_cycle(3))]  torus translation, 3 colors
+
+    Parameters:
+        N (int): The grid dimension.
+        C (int): Number of colors.
+        generators (list): (cell permutation, color permutation) pairs.
+        exempt (iterable): Flat cells excluded from the symmetry.
+
+    Returns:
+        tuple: (CNF, (orbit, perm)) with the tables needed by lift_model.
+    """
+    orbit, perm, reps, forbidden = symmetry_orbits(N, C, generators, exempt)
+    M = len(reps)
+    y = np.arange(M * C).reshape(M, C) + 1
+    blocks = [y]
+    i, j = np.triu_indices(C, k=1)
+    blocks.append(-np.stack([y[:, i], y[:, j]], axis=-1).reshape(-1, 2))
+    blocks.append(-y[forbidden][:, None])
+
+    # Cell q has color u iff its representative has color perm_inv[q][u]
+    perm_inv = np.argsort(perm, axis=1)
+    shapes = lshape_cells(N).astype(np.int64)
+    lits = orbit[shapes][:, :, None] * C + perm_inv[shapes]          # (K, 3 cells, C colors)
+    lits = np.sort(lits.transpose(0, 2, 1), axis=2).reshape(-1, 3) + 1
+    first, second, third = lits[:, 0], lits[:, 1], lits[:, 2]
+    o = (lits - 1) // C
+    # Two different colors of one orbit: subsumed by the at-most-one pairs
+    subsumed = ((o[:, 0] == o[:, 1]) & (first != second)) | ((o[:, 1] == o[:, 2]) & (second != third)) \
+        | ((o[:, 0] == o[:, 2]) & (first != third))
+    lits = lits[~subsumed]
+    dup_low = lits[:, 0] == lits[:, 1]
+    dup_high = lits[:, 1] == lits[:, 2]
+    blocks.append(-np.unique(lits[dup_low & dup_high][:, :1], axis=0))
+    blocks.append(-np.unique(lits[dup_low & ~dup_high][:, 1:], axis=0))
+    blocks.append(-np.unique(lits[~dup_low & dup_high][:, :2], axis=0))
+    blocks.append(-np.unique(lits[~dup_low & ~dup_high], axis=0))
+    return CNF.from_blocks(M * C, blocks), (orbit, perm)
+
+
+def model_values(models, num_vars):
+    """
+    Truth values of variables 1..num_vars in one model or a batch of models.
+
+    Literals outside 1..num_vars (auxiliary variables) are ignored, and a
+    variable missing from a model is false.
+
+    Parameters:
+        models: Literals of one model (list of ints, 1D array or
+            space-separated string), or a batch as a 2D array or a list of
+            such models (strings included).
+        num_vars (int): Number of variables to decode.
+
+    Returns:
+        np.array: Boolean array of shape (num_vars,) or (B, num_vars).
+    """
+    if isinstance(models, str):
+        models = np.array(models.split(), dtype=np.int64)
+    # A list of strings is a batch of model strings, not one model
+    single = isinstance(models, np.ndarray) and models.ndim == 1 or \
+        not isinstance(models, np.ndarray) and (len(models) == 0 or np.ndim(models[0]) == 0 and not isinstance(models[0], str))
+    if single:
+        models = [models]
+    if isinstance(models, np.ndarray):
+        lits = models.astype(np.int64, copy=False)
+        rows = np.repeat(np.arange(len(lits)), lits.shape[1])
+        lits = lits.ravel()
+    else:
+        models = [np.array(m.split(), dtype=np.int64) if isinstance(m, str) else np.asarray(m, dtype=np.int64)
+                  for m in models]
+        rows = np.repeat(np.arange(len(models)), [len(m) for m in models])
+        lits = np.concatenate(models) if models else np.zeros(0, dtype=np.int64)
+    keep = (lits != 0) & (np.abs(lits) <= num_vars)
+    values = np.zeros((len(models), num_vars + 1), dtype=bool)
+    values[rows[keep], np.abs(lits[keep])] = lits[keep] > 0
+    return values[0, 1:] if single else values[:, 1:]
+
+
+def lift_model(model, tables, N, C):
+    """
+    Lift a model of symmetric_cnf (or a batch of models) back to the full N x N grid.
+
+    Parameters:
+        model: Model literals of the quotient CNF, or a batch (see model_values).
+        tables (tuple): (orbit, perm) as returned by symmetric_cnf.
+        N (int): The grid dimension.
+        C (int): Number of colors.
+
+    Returns:
+        np.array: N x N grid (or (B, N, N) stack) with colors 1..C.
+    """
+    orbit, perm = tables
+    M = orbit.max() + 1
+    values = model_values(model, M * C)
+    rep_color = values.reshape(values.shape[:-1] + (M, C)).argmax(axis=-1)
+    grids = perm[np.arange(N * N), rep_color[..., orbit]] + 1
+    return grids.reshape(grids.shape[:-1] + (N, N))
+
+
 def decode_one_color_grid(sat_output, N):
     """
     Decodes the SAT solver output into an N x N one-color grid.
     
-    The SAT output is assumed to be a list (or a space‐separated string) of integers.
     The encoding is:
          variable number = (r-1)*N + c,  for 1 <= r,c <= N.
     A positive literal indicates that the corresponding cell is “colored” (set to 1).
     All other cells remain 0.
     
     Parameters:
-        sat_output (list or str): SAT output as a list of integers or as a string.
+        sat_output: SAT output as a list or array of integers or as a string,
+            or a batch of outputs (see model_values).
         N (int): Grid dimension.
     
     Returns:
-        one_color_grid (np.array): An N x N binary NumPy array.
+        one_color_grid (np.array): An N x N binary NumPy array, or a (B, N, N) stack.
     """
-    # If sat_output is a string, convert it to a list of integers.
-    if isinstance(sat_output, str):
-        sat_output = list(map(int, sat_output.split()))
-    
-    grid = np.zeros((N, N), dtype=int)
-    for v in sat_output:
-        if v > 0:
-            # Decode using: r = (v-1) // N, c = (v-1) % N.
-            r = (v - 1) // N
-            c = (v - 1) % N
-            grid[r][c] = 1
-    return grid
+    values = model_values(sat_output, N * N)
+    return values.reshape(values.shape[:-1] + (N, N)).astype(int)
 
-def one_color_to_four_color(one_color_grid):
+def one_color_to_four_color(one_color_grid, orbits=None):
     """
     Given a one-color solution grid (with 1's indicating the chosen cell in each orbit),
     this function builds a full four-color grid by “rotating” the one-color assignment.
@@ -184,46 +390,47 @@ def one_color_to_four_color(one_color_grid):
        orbit[(j+1)%4]   -> color 2
        orbit[(j+2)%4]   -> color 3
        orbit[(j+3)%4]   -> color 4
+    An orbit with no marked cell is left as zeros; for odd N a marked center gets color 4.
     
     Parameters:
-        one_color_grid (np.array): A binary N x N grid.
+        one_color_grid (np.array): A binary N x N grid, or a (B, N, N) stack of grids.
+        orbits (np.array): Precomputed rotation_orbits(N), to reuse across calls.
         
     Returns:
-        four_color_grid (np.array): An N x N grid with values 1..4 assigned per orbit.
+        four_color_grid (np.array): An N x N grid (or (B, N, N) stack) with values 1..4 assigned per orbit.
     """
-    N = one_color_grid.shape[0]
-    four_color_grid = np.zeros((N, N), dtype=int)
-    processed = np.zeros((N, N), dtype=bool)
-    
-    for r in range(N):
-        for c in range(N):
-            if processed[r, c]:
-                continue
-            # Compute the orbit of cell (r, c) using 0-indexing.
-            orbit = [
-                (r, c),
-                (c, N-1-r),
-                (N-1-r, N-1-c),
-                (N-1-c, r)
-            ]
-            # Mark all positions in this orbit as processed.
-            for (rr, cc) in orbit:
-                processed[rr, cc] = True
-            # Find which position in the orbit is "colored" (i.e. has a 1).
-            colored_index = None
-            for idx, (rr, cc) in enumerate(orbit):
-                if one_color_grid[rr, cc] == 1:
-                    colored_index = idx
-                    break
-            # If no cell is marked in this orbit, leave it as zeros.
-            if colored_index is None:
-                continue
-            # Assign colors cyclically.
-            for offset in range(4):
-                pos = orbit[(colored_index + offset) % 4]
-                # Colors will be 1, 2, 3, 4.
-                four_color_grid[pos] = offset + 1
-    return four_color_grid
+    one_color_grid = np.asarray(one_color_grid)
+    N = one_color_grid.shape[-1]
+    if orbits is None:
+        orbits = rotation_orbits(N)
+    flat = one_color_grid.reshape(one_color_grid.shape[:-2] + (N * N,)) == 1
+    marked = flat[..., orbits]
+    # Position of the first marked cell of every orbit; orbit[k] gets color (k - j) % 4 + 1
+    j = marked.argmax(axis=-1)
+    colors = (np.arange(4) - j[..., None]) % 4 + 1
+    colors[~marked.any(axis=-1)] = 0
+    four_color_grid = np.zeros(flat.shape, dtype=int)
+    four_color_grid[..., orbits] = colors
+    if N % 2 == 1:
+        center = (N * N) // 2
+        four_color_grid[..., center] = np.where(flat[..., center], 4, 0)
+    return four_color_grid.reshape(one_color_grid.shape)
+
+def decode_rotated_models(models, N, orbits=None):
+    """
+    Decode a batch of models of the single-color encoding straight into four-color grids.
+
+    The result can be checked in one call with verify.verify(grids, 4).
+
+    Parameters:
+        models: Batch of models (see model_values), or a single model.
+        N (int): Grid dimension.
+        orbits (np.array): Precomputed rotation_orbits(N).
+
+    Returns:
+        np.array: (B, N, N) stack of four-color grids (N x N for a single model).
+    """
+    return one_color_to_four_color(decode_one_color_grid(models, N), orbits)
 
 def visualize_four_color_grid(four_color_grid):
     """
@@ -273,20 +480,41 @@ def visualize_rotated_solution(sat_output, N):
     visualize_four_color_grid(four_color_grid)
 
 
+def solve_symmetric(N, C, generators, exempt=()):
+    """
+    Solve the L-shape problem restricted to colorings with the given symmetries (see symmetric_cnf).
+
+    Returns:
+        np.array: N x N grid with colors 1..C, or None if there is no such coloring.
+    """
+    cnf, tables = symmetric_cnf(N, C, generators, exempt)
+    solver = cnf.solver()
+    grid = lift_model(solver.get_model(), tables, N, C) if solver.solve() else None
+    solver.delete()
+    return grid
+
+
 if __name__ == "__main__":
-    # N must be even.
+    import sys
+
+    # N must be even for the single-color encoding; "generic" uses the quotient encoder,
+    # which leaves the center of an odd grid free.
     N = 17
-    # Generate clauses for a one-color assignment.
-    clauses = generate_single_color_clauses(N, write = False)
-    solver = Glucose3()
-    for clause in clauses:
-        solver.add_clause(clause)
-
-    if solver.solve():
-        model = solver.get_model()
-        print(model)
-        visualize_rotated_solution(model, N)
+    if "generic" in sys.argv[1:]:
+        grid = solve_symmetric(N, 4, [(rotation(N), color_cycle(4))], exempt=[(N * N) // 2] if N % 2 else [])
+        if grid is not None:
+            visualize_four_color_grid(grid)
+        else:
+            print("No solution found.")
     else:
-        print("No solution found.")
-
+        # Generate clauses for a one-color assignment.
+        clauses = generate_single_color_clauses(N, write = False)
+        solver = Glucose3()
+        clauses.add_to(solver)
 
+        if solver.solve():
+            model = solver.get_model()
+            print(model)
+            visualize_rotated_solution(model, N)
+        else:
+            print("No solution found.")
@@ -0,0 +1,256 @@
+import mmap
+import os
+import numpy as np
+
+# Width of the reserved header when the clause count is not known up front.
+# It holds "p cnf <vars> <clauses>" for counts of up to 20 digits each.
+HEADER_WIDTH = 64
+
+
+def format_clauses(lits, offsets):
+    """
+    Format a run of clauses as DIMACS text in one vectorized pass.
+
+    Parameters:
+        lits (np.array): Flat literal buffer of the clauses.
+        offsets (np.array): Clause boundaries, clause i spans
+            lits[offsets[i] - offsets[0]:offsets[i + 1] - offsets[0]].
+
+    Returns:
+        str: One line per clause, each terminated by " 0\n".
+    """
+    ends = np.asarray(offsets[1:]) - offsets[0]
+    if len(ends) == 0:
+        return ""
+    tokens = np.insert(np.asarray(lits), ends, 0).astype(str)
+    seps = np.full(len(tokens), " ")
+    seps[ends + np.arange(len(ends))] = "\n"
+    return "".join(np.char.add(tokens, seps).tolist())
+
+
+class DimacsWriter:
+    """
+    Stream clauses into a DIMACS CNF file in a single pass.
+
+    If num_clauses is given the exact header is written immediately, otherwise
+    a fixed-width header is reserved and patched in place when the writer is
+    closed. Clauses are buffered and written in chunks of chunk_size clauses,
+    so memory use does not grow with the size of the file.
+
+    Usage:
+        with DimacsWriter("lshape.cnf", num_vars) as writer:
+            writer.add_clause([1, 2, 3])
+            writer.add_block(np.array([[-1, -2], [-1, -3]]))
+    """
+
+    def __init__(self, filename, num_vars, num_clauses=None, chunk_size=65536):
+        self.filename = filename
+        self.num_vars = num_vars
+        self.expected_clauses = num_clauses
+        self.chunk_size = chunk_size
+        self.num_clauses = 0
+        self.buffer = []
+        self.f = open(filename, "w")
+        if num_clauses is None:
+            self.f.write(" " * (HEADER_WIDTH - 1) + "\n")
+        else:
+            self.f.write(f"p cnf {num_vars} {num_clauses}\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.f.close()
+
+    def add_clause(self, clause):
+        """
+        Buffer a single clause given as a sequence of literals.
+        """
+        self.buffer.append(" ".join(map(str, clause)) + " 0\n")
+        self.num_clauses += 1
+        if len(self.buffer) >= self.chunk_size:
+            self.flush()
+
+    def add_block(self, block):
+        """
+        Write a 2D array of clauses (one clause per row) in chunks.
+        """
+        block = np.asarray(block)
+        if block.size == 0:
+            return
+        width = block.shape[1]
+        for start in range(0, block.shape[0], self.chunk_size):
+            chunk = block[start:start + self.chunk_size]
+            offsets = np.arange(chunk.shape[0] + 1) * width
+            self.write(format_clauses(chunk.ravel(), offsets), chunk.shape[0])
+
+    def add_cnf(self, cnf):
+        """
+        Write every clause of a CNF clause store in chunks.
+        """
+        for start in range(0, len(cnf), self.chunk_size):
+            stop = min(start + self.chunk_size, len(cnf))
+            offsets = cnf.offsets[start:stop + 1]
+            lits = cnf.lits[offsets[0]:offsets[-1]]
+            self.write(format_clauses(lits, offsets), stop - start)
+
+    def write(self, text, count):
+        """
+        Write already formatted clause text holding count clauses.
+        """
+        self.flush()
+        self.f.write(text)
+        self.num_clauses += count
+
+    def flush(self):
+        if self.buffer:
+            self.f.write("".join(self.buffer))
+            self.buffer = []
+
+    def close(self):
+        """
+        Flush the remaining clauses and finalize the header.
+        """
+        self.flush()
+        if self.expected_clauses is None:
+            header = f"c\np cnf {self.num_vars} {self.num_clauses}"
+            # The padding stays inside the leading comment line
+            header = "c" + " " * (HEADER_WIDTH - len(header) - 1) + header[1:] + "\n"
+            self.f.seek(0)
+            self.f.write(header)
+        else:
+            assert self.num_clauses == self.expected_clauses, (
+                f"wrote {self.num_clauses} clauses, header says {self.expected_clauses}")
+        self.f.close()
+
+
+def mask_lines(buf, keep):
+    """
+    Blank out (set to spaces) every line of an ASCII buffer whose first byte is not in keep.
+
+    Parameters:
+        buf (np.array): uint8 buffer starting at the beginning of a line.
+        keep (bytes): First bytes of the lines to keep.
+
+    Returns:
+        np.array: Copy of buf with the other lines blanked.
+    """
+    if len(buf) == 0:
+        return buf.copy()
+    newline = buf == ord("\n")
+    line_id = np.concatenate([[0], np.cumsum(newline[:-1])])
+    first = buf[np.concatenate([[0], np.flatnonzero(newline[:-1]) + 1])]
+    keep_line = np.isin(first, np.frombuffer(keep, dtype=np.uint8)) | (first == ord("\n"))
+    out = buf.copy()
+    out[~keep_line[line_id]] = ord(" ")
+    return out
+
+
+def parse_ints(buf):
+    """
+    Parse every (optionally negative) integer of an ASCII buffer without Python strings.
+
+    Parameters:
+        buf (np.array): uint8 buffer of whitespace-separated integers.
+
+    Returns:
+        np.array: int64 array of the integers in order.
+    """
+    digit = (buf >= ord("0")) & (buf <= ord("9"))
+    in_token = digit | (buf == ord("-"))
+    if not in_token.any():
+        return np.zeros(0, dtype=np.int64)
+    prev = np.concatenate([[False], in_token[:-1]])
+    nxt = np.concatenate([in_token[1:], [False]])
+    starts = np.flatnonzero(in_token & ~prev)
+    ends = np.flatnonzero(in_token & ~nxt)
+    token = np.cumsum(in_token & ~prev) - 1
+
+    idx = np.flatnonzero(digit)
+    place = ends[token[idx]] - idx
+    values = np.zeros(len(starts), dtype=np.int64)
+    np.add.at(values, token[idx], (buf[idx] - ord("0")).astype(np.int64) * 10 ** place)
+    return np.where(buf[starts] == ord("-"), -values, values)
+
+
+def iter_dimacs(filename, chunk_size=1 << 24):
+    """
+    Stream the clauses of a DIMACS CNF file as NumPy arrays.
+
+    The file is memory-mapped and parsed chunk by chunk (chunk_size bytes, cut
+    at line ends); a clause spanning two chunks is carried over.
+
+    Parameters:
+        filename (str): DIMACS CNF file.
+        chunk_size (int): Approximate number of bytes parsed at once.
+
+    Yields:
+        tuple: (lits, offsets) for a run of clauses, with clause i spanning
+        lits[offsets[i]:offsets[i + 1]] (terminating zeros removed).
+    """
+    if os.path.getsize(filename) == 0:
+        # mmap cannot map an empty file
+        return
+    with open(filename, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # Some benchmark files end with a "%" line followed by junk: stop there
+        end = mm.find(b"\n%")
+        data = np.frombuffer(mm, dtype=np.uint8, count=len(mm) if end == -1 else end + 1)
+        try:
+            carry = np.zeros(0, dtype=np.int64)
+            start = 0
+            while start < len(data):
+                stop = min(start + chunk_size, len(data))
+                if stop < len(data):
+                    newline = mm.find(b"\n", stop, len(data))
+                    stop = len(data) if newline == -1 else newline + 1
+                # Comment and header lines are not clauses
+                chunk = mask_lines(data[start:stop], b"-0123456789 \t\r")
+                start = stop
+
+                tokens = np.concatenate([carry, parse_ints(chunk)])
+                zeros = np.flatnonzero(tokens == 0)
+                if len(zeros) == 0:
+                    carry = tokens
+                    continue
+                carry = tokens[zeros[-1] + 1:]
+                lits = np.delete(tokens[:zeros[-1] + 1], zeros).astype(np.int32)
+                offsets = np.concatenate([[0], zeros - np.arange(len(zeros))])
+                yield lits, offsets
+        finally:
+            # Release the view before the map is closed
+            del data
+
+
+def read_header(filename):
+    """
+    Return (num_vars, num_clauses) from the "p cnf" line of a DIMACS file.
+    """
+    with open(filename) as f:
+        for line in f:
+            if line.startswith("p"):
+                _, _, num_vars, num_clauses = line.split()
+                return int(num_vars), int(num_clauses)
+    raise ValueError(f"{filename} has no 'p cnf' header")
+
+
+def read_model(filename):
+    """
+    Read the model printed on the 'v' lines of a solver's output file.
+
+    Parameters:
+        filename (str): Solver output (Glucose, Kissat, CaDiCaL, parkissat).
+
+    Returns:
+        np.array: int64 array of the model literals, without the terminating 0
+        (empty for an empty file, e.g. a solver killed before printing anything).
+    """
+    if os.path.getsize(filename) == 0:
+        # mmap cannot map an empty file
+        return np.zeros(0, dtype=np.int64)
+    with open(filename, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        lines = mask_lines(np.frombuffer(mm, dtype=np.uint8), b"v")
+    lits = parse_ints(lines)
+    return lits[lits != 0]
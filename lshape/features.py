@@ -0,0 +1,165 @@
+import numpy as np
+from .cnf import CNF
+
+# Clause lengths 1..MAX_LENGTH get their own histogram bin, longer clauses share the last one
+MAX_LENGTH = 8
+
+
+def clause_features(cnf):
+    """
+    Structural features of a CNF, computed on the flat literal arrays.
+
+    Parameters:
+        cnf (CNF): Clause store.
+
+    Returns:
+        dict: Sizes and ratios, the clause-length histogram (as fractions),
+        variable-incidence degree statistics, literal polarity balance and the
+        fraction of Horn clauses.
+    """
+    lits = cnf.lits.astype(np.int64)
+    offsets = cnf.offsets
+    num_clauses = len(cnf)
+    num_vars = cnf.num_vars
+    lengths = np.diff(offsets)
+
+    features = {
+        "num_vars": num_vars,
+        "num_clauses": num_clauses,
+        "num_literals": len(lits),
+        "clause_var_ratio": num_clauses / num_vars if num_vars else 0.0,
+        "var_clause_ratio": num_vars / num_clauses if num_clauses else 0.0,
+        "clause_length_mean": lengths.mean() if num_clauses else 0.0,
+        "clause_length_max": int(lengths.max()) if num_clauses else 0,
+    }
+
+    hist = np.bincount(np.minimum(lengths, MAX_LENGTH), minlength=MAX_LENGTH + 1)[1:]
+    for length, count in enumerate(hist, start=1):
+        suffix = f"{length}+" if length == MAX_LENGTH else str(length)
+        features[f"clause_length_{suffix}"] = count / num_clauses if num_clauses else 0.0
+
+    # Variable-incidence graph: in how many clauses each variable occurs
+    degree = np.bincount(np.abs(lits), minlength=num_vars + 1)[1:]
+    positive = np.bincount(lits[lits > 0], minlength=num_vars + 1)[1:]
+    used = degree > 0
+    features["num_unused_vars"] = int((~used).sum())
+    if used.any():
+        d = degree[used]
+        p = np.bincount(d) / len(d)
+        p = p[p > 0]
+        features.update({
+            "var_degree_mean": d.mean(),
+            "var_degree_std": d.std(),
+            "var_degree_min": int(d.min()),
+            "var_degree_max": int(d.max()),
+            "var_degree_cv": d.std() / d.mean(),
+            "var_degree_entropy": float(-(p * np.log(p)).sum()),
+        })
+        # 0.5 when a variable occurs as often positively as negatively, 1 when pure
+        balance = np.abs(positive[used] / d - 0.5) + 0.5
+        features["polarity_balance_mean"] = balance.mean()
+        features["polarity_balance_std"] = balance.std()
+
+    if num_clauses:
+        clause_id = np.repeat(np.arange(num_clauses), lengths)
+        num_positive = np.bincount(clause_id, weights=lits > 0, minlength=num_clauses)
+        features["positive_literal_fraction"] = (lits > 0).mean() if len(lits) else 0.0
+        features["horn_fraction"] = (num_positive <= 1).mean()
+        features["negative_clause_fraction"] = (num_positive == 0).mean()
+    return features
+
+
+def propagation_features(cnf, num_values, k=(1, 4, 16), num_probes=20, seed=0, solver=None, num_cells=None):
+    """
+    Unit-propagation probes: fix k random cells to random values and measure
+    how much of the formula unit propagation decides.
+
+    The cell variables are taken to come first, laid out cell by cell with
+    num_values variables per cell (variable cell * num_values + v + 1), as in
+    lshape_cnf, vdw_to_cnf and symmetric_cnf (whose cells are the orbits).
+    With num_values = 1 (e.g. the single-color rotational encoding) each cell
+    is one Boolean variable fixed to a random polarity. Auxiliary variables
+    after them (e.g. the lex-leq variables of sorted_only) are never fixed and
+    not counted.
+
+    Parameters:
+        cnf (CNF): Clause store.
+        num_values (int): Variables per cell.
+        k (iterable): Numbers of cells fixed per probe.
+        num_probes (int): Probes per value of k.
+        seed (int): Random seed.
+        solver: Optional PySAT solver already loaded with cnf.
+        num_cells (int): Number of cells (N * N for lshape_cnf, n for
+            vdw_to_cnf); required when the encoding has auxiliary variables.
+            Defaults to cnf.num_vars // num_values.
+
+    Returns:
+        dict: For each k, the mean and standard deviation of the fraction of
+        cell variables assigned by propagation, and the fraction of probes
+        that ended in a conflict.
+    """
+    rng = np.random.default_rng(seed)
+    own_solver = solver is None
+    if own_solver:
+        solver = cnf.solver()
+    if num_cells is None:
+        num_cells = cnf.num_vars // num_values
+    num_cell_vars = num_cells * num_values
+    features = {}
+    for num_fixed in k:
+        num_fixed = min(num_fixed, num_cells)
+        assigned = np.zeros(num_probes)
+        conflicts = np.zeros(num_probes, dtype=bool)
+        for p in range(num_probes):
+            cells = rng.choice(num_cells, num_fixed, replace=False)
+            if num_values == 1:
+                assumptions = np.where(rng.random(num_fixed) < 0.5, cells + 1, -(cells + 1))
+            else:
+                assumptions = cells * num_values + rng.integers(num_values, size=num_fixed) + 1
+            ok, implied = solver.propagate(assumptions=assumptions.tolist())
+            conflicts[p] = not ok
+            implied = np.abs(np.asarray(implied, dtype=np.int64))
+            assigned[p] = (implied <= num_cell_vars).sum() / num_cell_vars
+        features[f"probe_{num_fixed}_assigned_mean"] = assigned.mean()
+        features[f"probe_{num_fixed}_assigned_std"] = assigned.std()
+        features[f"probe_{num_fixed}_conflict_fraction"] = conflicts.mean()
+    if own_solver:
+        solver.delete()
+    return features
+
+
+def instance_features(cnf, num_values=None, k=(1, 4, 16), num_probes=20, seed=0, num_cells=None):
+    """
+    All features of an instance: clause_features, plus propagation_features
+    when the number of variables per cell is given.
+
+    Parameters:
+        cnf (CNF or str): Clause store or DIMACS filename.
+        num_values (int): Variables per cell (C for lshape_cnf, r for
+            vdw_to_cnf, 1 for generate_single_color_clauses), or None to skip
+            the probes.
+        k, num_probes, seed, num_cells: See propagation_features.
+
+    Returns:
+        dict: Feature name to value.
+    """
+    if isinstance(cnf, str):
+        cnf = CNF.from_file(cnf)
+    features = clause_features(cnf)
+    if num_values is not None:
+        features.update(propagation_features(cnf, num_values, k, num_probes, seed, num_cells=num_cells))
+    # Plain Python numbers, so the features can be stored as JSON
+    return {name: value.item() if isinstance(value, np.generic) else value for name, value in features.items()}
+
+
+if __name__ == "__main__":
+    import time
+    import pandas as pd
+    from .lshape_to_cnf import lshape_cnf
+
+    rows = []
+    for N in (18, 19, 20):
+        start = time.time()
+        features = instance_features(lshape_cnf(N, 3), num_values=3, num_cells=N * N)
+        rows.append({"N": N, **features, "seconds": time.time() - start})
+    print(pd.DataFrame(rows).set_index("N").T.to_string())
@@ -1,4 +1,6 @@
+import random
 from pysat.solvers import Glucose3
+from .lshape_to_cnf import lshape_cnf
 
 def var(r, c, v, N, C):
     assert(1 <= r <= N and 1 <= c <= N and 1 <= v <= C) 
@@ -21,55 +23,15 @@ def lshape_to_cnf(N, C, fixed_subgrid=None, filename="lshape.cnf"):
         fixed_subgrid (list): List of tuples (r, c, v) for fixed values.
         filename (str): Output CNF filename.
     """
-    num_variables = N * N * C
-    num_clauses = 0
-    clauses = []
-
-    for r in range(1, N + 1):
-        for c in range(1, N + 1):
-            # Cell has at least one value
-            at_least_one = [var(r, c, v, N, C) for v in range(1, C + 1)]
-            clauses.append(at_least_one)
-            num_clauses += 1
-
-            # Cell has at most one value
-            for v in range(1, C + 1):
-                for w in range(v + 1, C + 1):
-                    clauses.append([-var(r, c, v, N, C), -var(r, c, w, N, C)])
-                    num_clauses += 1
-
-            # No L-shapes
-            if c > r:
-                for i in range(1, N - c + 1):
-                    for v in range(1, C + 1):
-                        clauses.append([
-                            -var(r, c, v, N, C),
-                            -var(r + i, c, v, N, C),
-                            -var(r + i, c + i, v, N, C)
-                        ])
-                        num_clauses += 1
-            else:
-                for i in range(1, N - r + 1):
-                    for v in range(1, C + 1):
-                        clauses.append([
-                            -var(r, c, v, N, C),
-                            -var(r + i, c, v, N, C),
-                            -var(r + i, c + i, v, N, C)
-                        ])
-                        num_clauses += 1
+    cnf = lshape_cnf(N, C)
 
     # Add fixed-value unit clauses
     if fixed_subgrid:
         for (r, c, v) in fixed_subgrid:
-            assert 1 <= r <= N and 1 <= c <= N and 1 <= v <= C
-            clauses.append([var(r, c, v, N, C)])
-            num_clauses += 1
+            cnf.append([var(r, c, v, N, C)])
 
     # Write the CNF
-    with open(filename, "w") as f:
-        f.write(f"p cnf {num_variables} {num_clauses}\n")
-        for clause in clauses:
-            f.write(" ".join(map(str, clause)) + " 0\n")
+    cnf.to_file(filename)
 
 
 def solve_lshape(N, C):
@@ -79,41 +41,12 @@ def solve_lshape(N, C):
     Parameters:
         N (int): Grid size.
         C (int): Number of values per cell.
-        fixed_subgrid (list): Optional list of fixed (r, c, v) constraints.
 
     Returns:
         List of (r, c, v) tuples representing the solution, or None if UNSAT.
     """
     solver = Glucose3()
-
-    # Build CNF clauses
-    for r in range(1, N + 1):
-        for c in range(1, N + 1):
-            # At least one value per cell
-            solver.add_clause([var(r, c, v, N, C) for v in range(1, C + 1)])
-
-            # At most one value per cell
-            for v in range(1, C + 1):
-                for w in range(v + 1, C + 1):
-                    solver.add_clause([-var(r, c, v, N, C), -var(r, c, w, N, C)])
-
-            # Avoid L-shapes
-            if c > r:
-                for i in range(1, N - c + 1):
-                    for v in range(1, C + 1):
-                        solver.add_clause([
-                            -var(r, c, v, N, C),
-                            -var(r + i, c, v, N, C),
-                            -var(r + i, c + i, v, N, C)
-                        ])
-            else:
-                for i in range(1, N - r + 1):
-                    for v in range(1, C + 1):
-                        solver.add_clause([
-                            -var(r, c, v, N, C),
-                            -var(r + i, c, v, N, C),
-                            -var(r + i, c + i, v, N, C)
-                        ])
+    lshape_cnf(N, C).add_to(solver)
 
     if solver.solve():
         model = solver.get_model()
@@ -122,8 +55,135 @@ def solve_lshape(N, C):
     else:
         return None
 
-prefix_N = 4
-prefix_C = 3
-N, C = 18, 3
-assignments = solve_lshape(prefix_N, prefix_C)
-lshape_to_cnf(N, C, fixed_subgrid=assignments, filename=f"prefix_lshape_{N}_{C}_{prefix_N}_{prefix_C}.cnf")
\ No newline at end of file
+def enumerate_prefixes(prefix_N, C, max_prefixes=None, seed=None, symmetry_breaking=("colors",)):
+    """
+    Enumerate valid prefix subgrids, one per color class.
+
+    Colors are numbered by first occurrence (value precedence), so no two
+    prefixes differ only by a permutation of the colors. With a seed, the
+    solver's phases are randomized before every model so that a truncated
+    enumeration is spread over the space instead of varying the last cells only.
+
+    Parameters:
+        prefix_N (int): Prefix grid size.
+        C (int): Number of values per cell.
+        max_prefixes (int): Stop after this many prefixes (None for all).
+        seed (int): Optional seed for randomized phases.
+        symmetry_breaking (iterable): Symmetry kinds to break, "colors" or none (see lshape_cnf).
+
+    Returns:
+        list: Prefixes as lists of (r, c, v) tuples.
+    """
+    num_cell_vars = prefix_N * prefix_N * C
+    solver = Glucose3(bootstrap_with=lshape_cnf(prefix_N, C, symmetry_breaking).to_lists())
+    rng = random.Random(seed) if seed is not None else None
+    prefixes = []
+    while max_prefixes is None or len(prefixes) < max_prefixes:
+        if rng is not None:
+            solver.set_phases([v if rng.random() < 0.5 else -v for v in range(1, num_cell_vars + 1)])
+        if not solver.solve():
+            break
+        model = solver.get_model()[:num_cell_vars]
+        prefixes.append([reverse_var(v, prefix_N, C) for v in model if v > 0])
+        solver.add_clause([-v for v in model if v > 0])
+    solver.delete()
+    return prefixes
+
+
+def probe_prefix(prefix, N, C, conflict_budget=10000, cnf=None):
+    """
+    Estimate how hard the N x N instance is once a prefix is fixed.
+
+    The prefix is passed as assumptions to a fresh solver loaded with the
+    N x N formula: first unit propagation, then a solve limited to
+    conflict_budget conflicts. Every probe starts from the same solver state,
+    so no learnt clause or heuristic state of one probe affects another and
+    the results do not depend on the order of the prefixes.
+
+    Parameters:
+        prefix (list): Fixed (r, c, v) tuples.
+        N (int): Grid size of the full instance.
+        C (int): Number of values per cell.
+        conflict_budget (int): Conflict limit of the probe solve.
+        cnf (CNF): Optional lshape_cnf(N, C), to build it only once for many probes.
+
+    Returns:
+        dict: status ("SAT", "UNSAT" or "UNKNOWN"), propagated literals,
+        conflicts and decisions spent by the probe, and the model if SAT.
+    """
+    if cnf is None:
+        cnf = lshape_cnf(N, C)
+    solver = cnf.solver()
+    assumptions = [var(r, c, v, N, C) for (r, c, v) in prefix]
+    no_conflict, implied = solver.propagate(assumptions=assumptions)
+    result = {"prefix": prefix, "propagated": len(implied), "conflicts": 0, "decisions": 0, "model": None}
+    if not no_conflict:
+        result["status"] = "UNSAT"
+        solver.delete()
+        return result
+
+    solver.conf_budget(conflict_budget)
+    status = solver.solve_limited(assumptions=assumptions)
+    stats = solver.accum_stats()
+    result["conflicts"] = stats["conflicts"]
+    result["decisions"] = stats["decisions"]
+    if status is None:
+        result["status"] = "UNKNOWN"
+    elif status:
+        result["status"] = "SAT"
+        result["model"] = solver.get_model()
+    else:
+        result["status"] = "UNSAT"
+    solver.delete()
+    return result
+
+
+def prefix_portfolio(N, C, prefix_N=4, top_k=8, max_prefixes=200, conflict_budget=10000, seed=0):
+    """
+    Rank candidate prefixes by a short probe of the N x N instance and write the top-k CNFs.
+
+    Prefixes refuted by the probe are dropped. The rest are ranked with probes
+    that already found a model first, then by the number of literals fixed by
+    unit propagation (a smaller residual problem), then by the conflicts spent.
+
+    Parameters:
+        N (int): Grid size of the full instance.
+        C (int): Number of values per cell.
+        prefix_N (int): Prefix grid size.
+        top_k (int): Number of CNF files to write.
+        max_prefixes (int): Number of candidate prefixes to probe.
+        conflict_budget (int): Conflict limit of each probe.
+        seed (int): Seed for the prefix enumeration.
+
+    Returns:
+        list of dict: Probe results of the top-k prefixes, each with its "filename".
+    """
+    prefixes = enumerate_prefixes(prefix_N, C, max_prefixes=max_prefixes, seed=seed)
+    cnf = lshape_cnf(N, C)
+    results = [probe_prefix(prefix, N, C, conflict_budget, cnf) for prefix in prefixes]
+
+    candidates = [res for res in results if res["status"] != "UNSAT"]
+    candidates.sort(key=lambda res: (res["status"] != "SAT", -res["propagated"], res["conflicts"]))
+    print(f"{len(prefixes)} prefixes probed, {len(prefixes) - len(candidates)} refuted.")
+
+    top = candidates[:top_k]
+    for rank, res in enumerate(top):
+        res["filename"] = f"prefix_lshape_{N}_{C}_{prefix_N}_{C}_{rank}.cnf"
+        lshape_to_cnf(N, C, fixed_subgrid=res["prefix"], filename=res["filename"])
+        print(f"#{rank}: {res['status']}, {res['propagated']} propagated, "
+              f"{res['conflicts']} conflicts -> {res['filename']}")
+    return top
+
+def single_prefix_cnf(N, C, prefix_N, prefix_C):
+    """
+    Write the N x N CNF with one solved prefix_N x prefix_N grid fixed in the top-left corner.
+    """
+    assignments = solve_lshape(prefix_N, prefix_C)
+    filename = f"prefix_lshape_{N}_{C}_{prefix_N}_{prefix_C}.cnf"
+    lshape_to_cnf(N, C, fixed_subgrid=assignments, filename=filename)
+    return filename
+
+if __name__ == "__main__":
+    N, C = 18, 3
+    # Probe many non-isomorphic prefixes and keep the most promising ones
+    prefix_portfolio(N, C, prefix_N=4, top_k=8)
@@ -1,47 +1,75 @@
 from pysat.solvers import Glucose3
 from .lshape_to_cnf import *
-import itertools
-from sympy import Matrix
+import time
+import numpy as np
 from tqdm import tqdm
-from sympy.combinatorics import Permutation, PermutationGroup
+from .canonical import canonical_form
+from .permutations import orbit
+from .verify import verify
 
-def solve_L_shape(N, C):
-    solution_set = []
-    iteration = 1
-    clauses = []
+def solve_L_shape(N, C, symmetry_breaking=()):
+    """
+    Enumerate all non-isomorphic solutions of the N x N L-shape problem, up to
+    row, column and color permutations (the orbits blocked by get_non_isomorphic_clauses).
 
-    # Generate initial L-shape constraints and add them to clauses
-    clauses.extend(generate_lshape_constraints(N, C))
+    One solver is kept alive for the whole enumeration: after each model only
+    the new blocking clauses are added, and the solver keeps its learnt clauses
+    between calls. Throughput (models per second) is reported on the progress bar.
 
-    # Initialize progress bar
-    with tqdm(desc="Solving L-shape", unit="solution", dynamic_ncols=True) as pbar:
-        while True:
-            solver = Glucose3()
+    With symmetry_breaking=("colors",) the value-precedence predicates are added
+    once up front (see lshape_cnf) and each model is blocked by a single clause
+    over its cell literals instead of a clause per group element. Every color
+    class keeps exactly one model, so deduplicating by canonical form finds the
+    same classes. Row and column orders are refused: they are not symmetries of
+    the L-shape problem and would cut whole classes.
 
-            for clause in clauses:
-                solver.add_clause(clause)
+    Parameters:
+        N (int): The grid dimension.
+        C (int): Number of possible values per cell.
+        symmetry_breaking (iterable): Symmetry kinds to break; only "colors".
 
-            if solver.solve():
-                new_solution = solver.get_model()
-                # Decode the solution into a grid format
-                decoded_solution = decode_solution(new_solution, N, C)
+    Returns:
+        list of lists: One decoded grid per non-isomorphic solution.
+    """
+    solution_set = []
+    seen = set()
+    iteration = 1
 
-                # Check if the solution is isomorphic to any previous one
-                if all(not is_isomorphic(decoded_solution, sol, N) for sol in solution_set):
-                    solution_set.append(decoded_solution)
-                    pbar.update(1)
+    # Generate initial L-shape constraints and load them once
+    solver = Glucose3(bootstrap_with=lshape_cnf(N, C, symmetry_breaking).to_lists())
+    start = time.perf_counter()
 
-                    # Add non-isomorphic constraints to clauses for the next iteration
-                    non_isomorphic_clauses = get_non_isomorphic_clauses(" ".join(map(str, new_solution)), N, C)
-                    clauses.extend(non_isomorphic_clauses)
+    # Initialize progress bar
+    with tqdm(desc="Solving L-shape", unit="solution", dynamic_ncols=True) as pbar:
+        while solver.solve():
+            new_solution = solver.get_model()
+            # Decode the solution into a grid format
+            decoded_solution = decode_solution(new_solution, N, C)
+
+            # Check if the solution is isomorphic to any previous one
+            canon = canonical_form(decoded_solution, C)
+            if canon not in seen:
+                seen.add(canon)
+                solution_set.append(decoded_solution)
+                pbar.update(1)
+
+            if symmetry_breaking:
+                # Symmetries are already broken statically: block just this model
+                solver.add_clause([-lit for lit in new_solution[:N * N * C] if lit > 0])
             else:
-                pbar.close()
-                print("No more solutions found.")
-                break
-            
+                # Block this solution and its isomorphic copies for the next iteration
+                non_isomorphic_clauses = get_non_isomorphic_clauses(" ".join(map(str, new_solution)), N, C)
+                solver.append_formula(non_isomorphic_clauses)
+
+            elapsed = time.perf_counter() - start
+            pbar.set_postfix(models=iteration, models_per_sec=f"{iteration / elapsed:.2f}")
             iteration += 1
 
-    print(f"All {len(solution_set)} non-isomorphic solutions found.")
+    solver.delete()
+    elapsed = time.perf_counter() - start
+    print("No more solutions found.")
+    print(f"All {len(solution_set)} non-isomorphic solutions found "
+          f"({iteration - 1} models in {elapsed:.1f}s, {(iteration - 1) / elapsed:.2f} models/s).")
     return solution_set
 
 
@@ -59,7 +87,8 @@ def decode_solution(solution, N, C):
     """
     grid = [[0 for _ in range(N)] for _ in range(N)]
     for literal in solution:
-        if literal > 0:
+        # Literals above N * N * C are auxiliary (e.g. symmetry-breaking) variables
+        if 0 < literal <= N * N * C:
             r = (literal - 1) // (N * C) + 1
             c = ((literal - 1) % (N * C)) // C + 1
             v = ((literal - 1) % C) + 1
@@ -77,29 +106,11 @@ def is_isomorphic(solution1, solution2, N):
     Returns:
         True if solution1 and solution2 are isomorphic; False otherwise.
     """
-    grid1 = Matrix(solution1)
-    grid2 = Matrix(solution2)
-
-    # Define row and column permutation groups
-    row_group = PermutationGroup(*[Permutation(p) for p in itertools.permutations(range(N))])
-    col_group = PermutationGroup(*[Permutation(p) for p in itertools.permutations(range(N))])
-
-    # Iterate over unique row and column permutations
-    for row_perm in row_group.generate():
-        for col_perm in col_group.generate():
-            # Apply the row and column permutations
-            permuted_grid = grid1.permute_rows(row_perm.array_form)
-            permuted_grid = permuted_grid.permute_cols(col_perm.array_form)
-
-            # Check if the permuted grid is equal to the target grid
-            if permuted_grid == grid2:
-                return True
-
-    return False
+    return canonical_form(solution1, color_perms=False) == canonical_form(solution2, color_perms=False)
 
 def is_sat(matrix, N, C):
     """
-    Check if a given matrix satisfies the constraints (including no L-shape) using a SAT solver.
+    Check if a given matrix satisfies the constraints (including no L-shape) by checking every L-shape directly.
 
     Parameters:
         matrix: 2D list representing the N x N grid solution.
@@ -109,25 +120,7 @@ def is_sat(matrix, N, C):
     Returns:
         bool: True if the matrix satisfies the constraints, False otherwise.
     """
-    clauses = []
-
-    # Add general L-shape constraints
-    clauses.extend(generate_lshape_constraints(N, C))
-
-    # Add fixed value constraints (unit clauses)
-    for r in range(N):
-        for c in range(N):
-            v = matrix[r][c]
-            fixed_clause = [int(var(r + 1, c + 1, v, N, C))]
-            clauses.append(fixed_clause)
-
-    solver = Glucose3()
-    for clause in clauses:
-        solver.add_clause(clause)
-
-    is_satisfiable = solver.solve()
-    solver.delete() 
-    return is_satisfiable
+    return verify(matrix, C)
 
 
 def generate_isomorphic_solutions(matrix, N, C):
@@ -142,29 +135,16 @@ def generate_isomorphic_solutions(matrix, N, C):
     Returns:
         list of 2D lists: All SAT solutions in the same isomorphic group.
     """
-    grid = Matrix(matrix)
-
-    # Define row and column permutation groups
-    row_group = PermutationGroup(*[Permutation(p) for p in itertools.permutations(range(N))])
-    col_group = PermutationGroup(*[Permutation(p) for p in itertools.permutations(range(N))])
-
-    isomorphic_solutions = []
+    # All row/column permutations of the grid, computed in one array operation
+    permuted_grids = orbit(matrix)
 
-    # Iterate over unique row and column permutations
-    for row_perm in row_group.generate():
-        for col_perm in col_group.generate():
-            # Apply the row and column permutations
-            permuted_grid = grid.permute_rows(row_perm.array_form)
-            permuted_grid = permuted_grid.permute_cols(col_perm.array_form)
+    # Keep the first occurrence of every distinct grid, in permutation order
+    _, first = np.unique(permuted_grids.reshape(len(permuted_grids), -1), axis=0, return_index=True)
+    permuted_grids = permuted_grids[np.sort(first)]
 
-            # Convert to a proper numeric list
-            permuted_matrix = [[int(x) for x in permuted_grid.row(i)] for i in range(N)]
+    # Check all permuted grids against the L-shape constraints at once
+    isomorphic_solutions = permuted_grids[verify(permuted_grids, C)].tolist()
 
-            # Check if the permuted solution satisfies the L-shape constraints
-            if is_sat(permuted_matrix, N, C):
-                if permuted_matrix not in isomorphic_solutions:
-                    isomorphic_solutions.append(permuted_matrix)
-    
     print(f"All {len(isomorphic_solutions)} isomorphic solutions found.")
     return isomorphic_solutions
 
@@ -0,0 +1,159 @@
+import time
+import numpy as np
+from .lshape_to_cnf import lshape_cnf
+from .verify import verify
+
+# Placements of an N x N grid inside the (N+1) x (N+1) grid: (row offset, column offset)
+OFFSETS = ((0, 0), (0, 1), (1, 0), (1, 1))
+
+
+def model_to_grid(model, N, C):
+    """
+    Decode a model of lshape_cnf(N, C) into an N x N grid with colors 1..C.
+    """
+    lits = np.asarray(model, dtype=np.int64)
+    lits = lits[(lits > 0) & (lits <= N * N * C)] - 1
+    grid = np.zeros(N * N, dtype=np.int64)
+    grid[lits // C] = lits % C + 1
+    return grid.reshape(N, N)
+
+
+def embed(grid, offset):
+    """
+    Place an N x N grid inside an (N+1) x (N+1) grid at a (row, column) offset.
+
+    L-shape avoidance is invariant under translation, so the embedded cells
+    stay valid; only the new row and column (an L-shaped border) are unknown.
+
+    Returns:
+        tuple: ((N+1) x (N+1) grid with 0 for the new cells, (N+1) x (N+1)
+        distance of every cell to the new row or column, 0 on the border).
+    """
+    grid = np.asarray(grid)
+    N = grid.shape[0]
+    dr, dc = offset
+    big = np.zeros((N + 1, N + 1), dtype=np.int64)
+    big[dr:dr + N, dc:dc + N] = grid
+    new_row = 0 if dr else N
+    new_col = 0 if dc else N
+    r, c = np.indices((N + 1, N + 1))
+    distance = np.minimum(np.abs(r - new_row), np.abs(c - new_col))
+    return big, distance
+
+
+def relax_widths(N):
+    """
+    Default relaxation schedule: free the border, then bands of width 1, 2, 4, ... around it, then everything.
+    """
+    widths = [0]
+    while widths[-1] < N:
+        widths.append(min(N, max(1, 2 * widths[-1])))
+    return widths
+
+
+def grow_step(solver, grid, C, offsets=OFFSETS, widths=None, conflict_budget=20000):
+    """
+    Extend an N x N certificate to an (N+1) x (N+1) one.
+
+    The solver must hold lshape_cnf(N + 1, C). For every relaxation width in
+    turn, and every placement of the certificate, the cells within that
+    distance of the new row and column are left free and all other cells are
+    pinned by assumptions; the phases of all embedded cells are set to the
+    certificate, so even the freed cells start from their old colors. An
+    attempt that is refuted under its assumptions or runs out of its conflict
+    budget moves on to the next placement, then to a wider band. The last
+    width frees every cell, so only the phases remain.
+
+    Parameters:
+        solver: PySAT solver loaded with lshape_cnf(N + 1, C); reused by the caller across steps.
+        grid (np.array): N x N certificate with colors 1..C.
+        C (int): Number of colors.
+        offsets (iterable): Placements to try, see OFFSETS.
+        widths (list): Relaxation widths, see relax_widths.
+        conflict_budget (int): Conflict limit of each attempt (None for no limit).
+
+    Returns:
+        dict: 'grid' ((N+1) x (N+1) certificate or None), 'status' ("SAT",
+        "UNSAT" or "UNKNOWN"), the 'offset' and 'width' that succeeded, the
+        number of 'attempts' and the total 'conflicts'.
+    """
+    grid = np.asarray(grid)
+    N = grid.shape[0]
+    M = N + 1
+    if widths is None:
+        widths = relax_widths(N)
+    result = {"grid": None, "status": "UNKNOWN", "offset": None, "width": None, "attempts": 0, "conflicts": 0}
+    values = np.arange(1, C + 1)
+    for w, width in enumerate(widths):
+        last = w == len(widths) - 1
+        for offset in offsets:
+            big, distance = embed(grid, offset)
+            cells = np.flatnonzero(big.ravel())
+            lits = cells * C + big.ravel()[cells]
+            # Positive phase on the certificate's color, negative on the other colors of the cell
+            phases = np.where(values == big.ravel()[cells, None], 1, -1) * (cells[:, None] * C + values)
+            solver.set_phases(phases.ravel().tolist())
+            pinned = distance.ravel()[cells] > width
+            assumptions = lits[pinned].tolist()
+
+            before = solver.accum_stats()["conflicts"]
+            if conflict_budget is None:
+                status = solver.solve(assumptions=assumptions)
+            else:
+                solver.conf_budget(conflict_budget)
+                status = solver.solve_limited(assumptions=assumptions)
+            result["conflicts"] += solver.accum_stats()["conflicts"] - before
+            result["attempts"] += 1
+            if status:
+                result.update(grid=model_to_grid(solver.get_model(), M, C), status="SAT", offset=offset, width=width)
+                return result
+            if status is False and not assumptions:
+                # Refuted without assumptions: the (N+1) x (N+1) instance itself is UNSAT
+                result["status"] = "UNSAT"
+                return result
+            # Nothing is pinned at the last width, so the other placements would repeat the same search
+            if last:
+                break
+    return result
+
+
+def grow(grid, C, target_N, offsets=OFFSETS, widths=None, conflict_budget=20000, solver_name="glucose3"):
+    """
+    Grow a certificate size by size up to target_N, each size warm-started from the previous one.
+
+    Parameters:
+        grid (np.array): N x N certificate with colors 1..C (e.g. model_to_grid of an earlier run).
+        C (int): Number of colors.
+        target_N (int): Size to reach.
+        offsets, widths, conflict_budget: See grow_step.
+        solver_name (str): PySAT solver, see CNF.solver.
+
+    Returns:
+        dict: Certificate (np.array) per size reached, starting with the input size.
+    """
+    grid = np.asarray(grid)
+    certificates = {grid.shape[0]: grid}
+    for M in range(grid.shape[0] + 1, target_N + 1):
+        start = time.time()
+        solver = lshape_cnf(M, C).solver(solver_name)
+        result = grow_step(solver, grid, C, offsets, widths, conflict_budget)
+        solver.delete()
+        print(f"{M} x {M}: {result['status']} with offset {result['offset']}, width {result['width']}, "
+              f"{result['attempts']} attempts, {result['conflicts']} conflicts, {time.time() - start:.1f}s")
+        if result["grid"] is None:
+            break
+        assert verify(result["grid"], C)
+        grid = result["grid"]
+        certificates[M] = grid
+    return certificates
+
+
+if __name__ == "__main__":
+    N, C = 12, 3
+    solver = lshape_cnf(N, C).solver()
+    solver.solve()
+    grid = model_to_grid(solver.get_model(), N, C)
+    solver.delete()
+    certificates = grow(grid, C, target_N=18)
+    for M, certificate in certificates.items():
+        np.save(f"lshape_{M}_{C}_certificate.npy", certificate)
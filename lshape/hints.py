@@ -0,0 +1,208 @@
+import numpy as np
+from .dimacs import DimacsWriter, format_clauses
+from .grow import relax_widths
+from .local_search import LocalSearch
+from .lshape_to_cnf import lshape_cells, lshape_cnf
+from .verify import monochromatic_lshapes
+
+
+def place(grid, N, offset=(0, 0)):
+    """
+    Place a smaller (or equal) grid inside an N x N grid.
+
+    Parameters:
+        grid (np.array): n x n grid with colors 1..C (0 for unknown cells).
+        N (int): Target grid size, at least n.
+        offset (tuple): (row, column) of the grid's top-left cell.
+
+    Returns:
+        tuple: (N x N grid with 0 outside the placed grid, N x N distance of
+        every placed cell to the nearest uncovered row or column; 0 outside
+        the placed grid and N where the grid covers the whole target).
+    """
+    grid = np.asarray(grid)
+    n = grid.shape[0]
+    dr, dc = offset
+    if dr + n > N or dc + n > N:
+        raise ValueError(f"a {n} x {n} grid at offset {offset} does not fit in {N} x {N}")
+    big = np.zeros((N, N), dtype=np.int64)
+    big[dr:dr + n, dc:dc + n] = grid
+    r, c = np.indices((N, N))
+    distance = np.full((N, N), N)
+    # Distance to each uncovered side, if there is one
+    if dr > 0:
+        distance = np.minimum(distance, r - dr + 1)
+    if dr + n < N:
+        distance = np.minimum(distance, dr + n - r)
+    if dc > 0:
+        distance = np.minimum(distance, c - dc + 1)
+    if dc + n < N:
+        distance = np.minimum(distance, dc + n - c)
+    distance[big == 0] = 0
+    return big, np.maximum(distance, 0)
+
+
+def polish(grid, C, fixed=None, max_steps=100000, noise=0.1, seed=0):
+    """
+    Complete a partial grid and repair its monochromatic L-shapes with local search.
+
+    Unknown cells (0) are first filled greedily with their least conflicting
+    color, then local_search.LocalSearch runs for at most max_steps moves.
+
+    Parameters:
+        grid (np.array): N x N grid with colors 1..C and 0 for unknown cells.
+        C (int): Number of colors.
+        fixed (np.array): Optional N x N boolean mask of cells never recolored.
+        max_steps (int): Limit on the number of recolorings.
+        noise (float): Probability of a random move.
+        seed (int): Random seed.
+
+    Returns:
+        tuple: (N x N grid with colors 1..C, number of monochromatic L-shapes left).
+    """
+    grid = np.asarray(grid)
+    search = LocalSearch(grid.shape[0], C, grid, fixed, seed, fill="greedy")
+    if max_steps == 0:
+        return search.grid(), search.num_bad
+    result = search.run(max_steps=max_steps, noise=noise)
+    return result["grid"], result["violations"]
+
+
+def phase_literals(grid, C):
+    """
+    Phase literals of the colored cells of a grid: the cell's color positive, its other colors negative.
+    """
+    flat = np.asarray(grid).ravel()
+    cells = np.flatnonzero(flat)
+    values = np.arange(1, C + 1)
+    return (np.where(values == flat[cells, None], 1, -1) * (cells[:, None] * C + values)).ravel()
+
+
+def assumption_cubes(grid, C, distance, widths, exclude=None):
+    """
+    Nested cubes pinning the colored cells farther than each width from the uncovered region.
+
+    Parameters:
+        grid (np.array): N x N grid with colors 1..C (0 for unknown cells).
+        C (int): Number of colors.
+        distance (np.array): N x N distances, see place.
+        widths (list): One cube per width; duplicate cubes are dropped.
+        exclude (np.array): Optional N x N boolean mask of cells never pinned.
+
+    Returns:
+        list: Cubes as int arrays of positive literals, from the most to the least constrained.
+    """
+    flat = np.asarray(grid).ravel()
+    keep = flat > 0
+    if exclude is not None:
+        keep &= ~np.asarray(exclude).ravel()
+    cubes = []
+    for width in widths:
+        cells = np.flatnonzero(keep & (distance.ravel() > width))
+        cube = cells * C + flat[cells]
+        if not cubes or len(cube) != len(cubes[-1]):
+            cubes.append(cube)
+    return cubes
+
+
+def write_phases(filename, grid, C):
+    """
+    Write the phases of a grid as a 'v' line model ("v lit ... 0").
+
+    The file can be read back with dimacs.read_model and passed to a PySAT
+    solver's set_phases, or to the phase() call of a solver's library API.
+    """
+    lits = phase_literals(grid, C)
+    with open(filename, "w") as f:
+        f.write("v " + " ".join(map(str, lits.tolist())) + " 0\n")
+
+
+def write_icnf(filename, cnf, cubes, chunk_size=65536):
+    """
+    Write a formula and its assumption cubes in the incremental iCNF format ("p inccnf", one "a ... 0" line per cube).
+
+    CaDiCaL and other iCNF-aware solvers solve the formula under every cube in turn.
+    """
+    with open(filename, "w") as f:
+        f.write("p inccnf\n")
+        for start in range(0, len(cnf), chunk_size):
+            stop = min(start + chunk_size, len(cnf))
+            offsets = cnf.offsets[start:stop + 1]
+            f.write(format_clauses(cnf.lits[offsets[0]:offsets[-1]], offsets))
+        for cube in cubes:
+            f.write("a " + "".join(f"{lit} " for lit in cube.tolist()) + "0\n")
+
+
+def write_cube_cnf(filename, cnf, cube):
+    """
+    Write a formula with a cube added as unit clauses, for plain DIMACS solvers (Kissat, parkissat).
+    """
+    with DimacsWriter(filename, cnf.num_vars, num_clauses=len(cnf) + len(cube)) as writer:
+        writer.add_cnf(cnf)
+        writer.add_block(np.asarray(cube)[:, None])
+
+
+def export_hints(grid, N, C, prefix, offset=(0, 0), widths=None, polish_steps=100000, seed=0):
+    """
+    Turn a known grid into warm-start files for the N x N instance.
+
+    The grid (a smaller certificate, a rotational construction from
+    cyclic_color.one_color_to_four_color, ...) is placed at offset, completed
+    and repaired by polish, and exported three ways:
+
+        <prefix>.phases        phases of the polished N x N grid ('v' line)
+        <prefix>.icnf          lshape_cnf(N, C) with one assumption cube per width
+        <prefix>_cube<k>.cnf   the same cubes as unit clauses, one DIMACS file each
+
+    Cubes only pin the placed cells (with their polished colors) that are not
+    in a monochromatic L-shape of the polished grid, starting with every such cell and freeing
+    a wider band next to the uncovered region in each following cube.
+
+    Kissat has no phase-file option, so for Kissat and parkissat the cube
+    files are the way in: any <prefix>_cube<k>.cnf can be passed to solve.sh
+    as $1. The phases serve PySAT (set_phases) and library-API solvers.
+
+    Parameters:
+        grid (np.array): n x n grid with colors 1..C (0 for unknown cells), n <= N.
+        N (int): Target grid size.
+        C (int): Number of colors.
+        prefix (str): Output filename prefix.
+        offset (tuple): Placement of the grid, see place.
+        widths (list): Relaxation widths, see grow.relax_widths.
+        polish_steps (int): Local-search steps of polish (0 to skip it).
+        seed (int): Random seed of polish.
+
+    Returns:
+        dict: 'files' written, the 'cubes', the polished 'grid' and the
+        number of monochromatic L-shapes it has left ('violations').
+    """
+    big, distance = place(grid, N, offset)
+    polished, violations = polish(big, C, max_steps=polish_steps, seed=seed)
+    conflicted = np.zeros(N * N, dtype=bool)
+    conflicted[lshape_cells(N)[monochromatic_lshapes(polished)].ravel()] = True
+    # Pin the polished colors of the placed cells, so the first cube holds whenever polish succeeded
+    cubes = assumption_cubes(np.where(big > 0, polished, 0), C, distance, widths if widths is not None else relax_widths(N),
+                             exclude=conflicted.reshape(N, N))
+
+    cnf = lshape_cnf(N, C)
+    files = [f"{prefix}.phases", f"{prefix}.icnf"]
+    write_phases(files[0], polished, C)
+    write_icnf(files[1], cnf, cubes)
+    for k, cube in enumerate(cubes):
+        files.append(f"{prefix}_cube{k}.cnf")
+        write_cube_cnf(files[-1], cnf, cube)
+    return {"files": files, "cubes": cubes, "grid": polished, "violations": violations}
+
+
+if __name__ == "__main__":
+    from .cyclic_color import generate_single_color_clauses, decode_one_color_grid, one_color_to_four_color
+
+    # A 4-color rotational grid as the hint for the plain 4-color instance
+    n, N, C = 16, 18, 4
+    solver = generate_single_color_clauses(n).solver()
+    solver.solve()
+    grid = one_color_to_four_color(decode_one_color_grid(solver.get_model(), n))
+    solver.delete()
+    hints = export_hints(grid, N, C, f"hints_lshape_{N}_{C}", offset=(1, 1))
+    print(f"{hints['violations']} violations left after polishing, {len(hints['cubes'])} cubes:")
+    print("\n".join(hints["files"]))
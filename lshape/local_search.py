@@ -0,0 +1,272 @@
+import os
+import time
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from .lshape_to_cnf import lshape_cells, cell_lshapes
+from .verify import verify
+
+# Set by the first walker of run_walkers that finds a solution (see _init_walker)
+_stop = None
+
+
+class LocalSearch:
+    """
+    Tabu min-conflicts local search over L-shape colorings of the N x N grid.
+
+    The search works on the grid, not on clauses: the constraints are those of
+    lshape_cnf / generate_lshape_constraints (one color per cell, no
+    monochromatic L-shape (r, c), (r + i, c), (r + i, c + i)), with the
+    one-color-per-cell part built into the representation. For every cell it
+    keeps the number of monochromatic L-shapes through it, and the violated
+    L-shapes in a set with O(1) insertion and removal. A cell lies in O(N)
+    L-shapes, so scoring and applying a recoloring costs O(N).
+
+    Each step picks a random violated L-shape (WalkSAT's focus), scores every
+    recoloring of its free cells and applies the best one that is not tabu,
+    unless it improves on the best so far (aspiration); with probability noise
+    a random recoloring is applied instead. A cell's old color is tabu for
+    tabu + random(tabu) steps. After restart_after steps without improvement
+    a fraction of the best grid is recolored at random.
+
+    Usage:
+        search = LocalSearch(18, 3, seed=1)
+        result = search.run(max_steps=10**6)
+        if result["status"] == "SAT": print(result["grid"])
+    """
+
+    def __init__(self, N, C, grid=None, fixed=None, seed=0, fill="random"):
+        """
+        Parameters:
+            N (int): The grid dimension.
+            C (int): Number of colors, at least 2.
+            grid (np.array): Optional N x N initial grid with colors 1..C; 0
+                (or no grid) for cells still to color.
+            fixed (np.array): Optional N x N boolean mask of cells never recolored.
+            seed (int): Random seed.
+            fill (str): How cells still to color get their first color:
+                "random", or "greedy" (least conflicting color, cell by cell).
+        """
+        if C < 2:
+            raise ValueError(f"local search needs at least 2 colors to recolor a cell, got C = {C}")
+        self.N, self.C = N, C
+        self.fill = fill
+        self.rng = np.random.default_rng(seed)
+        self.shapes = lshape_cells(N).astype(np.int64)
+        self.indptr, self.incident, self.others = cell_lshapes(N)
+        self.free = np.ones(N * N, dtype=bool) if fixed is None else ~np.asarray(fixed, dtype=bool).ravel()
+        self.tabu_until = np.zeros(N * N * C, dtype=np.int64)
+        self.steps = 0
+        self.reset(grid)
+
+    def reset(self, grid=None, fill=None):
+        """
+        Start from a grid (1..C, 0 for cells to fill) and recompute all counts from scratch.
+
+        fill overrides the fill mode given to the constructor.
+        """
+        N, C = self.N, self.C
+        colors = np.zeros(N * N, dtype=np.int64) if grid is None else np.asarray(grid, dtype=np.int64).ravel().copy()
+        # 0-based colors internally, -1 until filled
+        self.color = colors - 1
+        unknown = np.flatnonzero(colors == 0)
+        if (fill or self.fill) == "greedy":
+            for p in unknown:
+                counts = self.conflicts(p)
+                self.color[p] = self.rng.choice(np.flatnonzero(counts == counts.min()))
+        else:
+            self.color[unknown] = self.rng.integers(C, size=len(unknown))
+        a, b, c = self.color[self.shapes].T
+        self.mono = (a == b) & (b == c)
+        self.cell_bad = np.bincount(self.shapes[self.mono].ravel(), minlength=N * N)
+        bad = np.flatnonzero(self.mono)
+        self.bad_list = np.zeros(len(self.shapes), dtype=np.int64)
+        self.bad_list[:len(bad)] = bad
+        self.bad_pos = np.full(len(self.shapes), -1)
+        self.bad_pos[bad] = np.arange(len(bad))
+        self.num_bad = len(bad)
+
+    def grid(self):
+        """
+        The current grid with colors 1..C.
+        """
+        return (self.color + 1).reshape(self.N, self.N)
+
+    def conflicts(self, p):
+        """
+        Number of monochromatic L-shapes cell p would be in, for each 0-based color.
+        """
+        pair = self.color[self.others[self.indptr[p]:self.indptr[p + 1]]]
+        same = (pair[:, 0] == pair[:, 1]) & (pair[:, 0] >= 0)
+        return np.bincount(pair[same, 0], minlength=self.C)
+
+    def recolor(self, p, v):
+        """
+        Give cell p the 0-based color v and update the counts of the L-shapes through it.
+        """
+        lo, hi = self.indptr[p], self.indptr[p + 1]
+        ids = self.incident[lo:hi]
+        pair = self.color[self.others[lo:hi]]
+        now = (pair[:, 0] == pair[:, 1]) & (pair[:, 0] == v)
+        was = self.mono[ids]
+        for shape in ids[now & ~was].tolist():
+            self.bad_pos[shape] = self.num_bad
+            self.bad_list[self.num_bad] = shape
+            self.num_bad += 1
+            self.cell_bad[self.shapes[shape]] += 1
+        for shape in ids[was & ~now].tolist():
+            # Move the last violated L-shape into the freed slot
+            pos = self.bad_pos[shape]
+            last = self.bad_list[self.num_bad - 1]
+            self.bad_list[pos] = last
+            self.bad_pos[last] = pos
+            self.bad_pos[shape] = -1
+            self.num_bad -= 1
+            self.cell_bad[self.shapes[shape]] -= 1
+        self.mono[ids] = now
+        self.color[p] = v
+
+    def step(self, tabu=10, noise=0.05, best=None):
+        """
+        Make one move; returns False when the picked L-shape has no free cell.
+        """
+        C = self.C
+        cells = self.shapes[self.bad_list[self.rng.integers(self.num_bad)]]
+        cells = cells[self.free[cells]]
+        if len(cells) == 0:
+            return False
+        if self.rng.random() < noise:
+            p = self.rng.choice(cells)
+            v = (self.color[p] + self.rng.integers(1, C)) % C
+        else:
+            # Change in the number of violated L-shapes for every (cell, color) move
+            delta = np.stack([self.conflicts(p) - self.cell_bad[p] for p in cells])
+            valid = np.ones_like(delta, dtype=bool)
+            valid[np.arange(len(cells)), self.color[cells]] = False
+            tabu_moves = self.tabu_until[cells[:, None] * C + np.arange(C)] > self.steps
+            aspiration = best is not None and self.num_bad + delta < best
+            allowed = valid & (~tabu_moves | aspiration)
+            if not allowed.any():
+                allowed = valid
+            delta[~allowed] = np.iinfo(np.int64).max
+            i, v = divmod(self.rng.choice(np.flatnonzero(delta.ravel() == delta.min())), C)
+            p = cells[i]
+        self.tabu_until[p * C + self.color[p]] = self.steps + tabu + self.rng.integers(tabu + 1)
+        self.recolor(p, v)
+        self.steps += 1
+        return True
+
+    def run(self, max_steps=10 ** 6, tabu=10, noise=0.05, restart_after=50000, restart_fraction=0.1,
+            time_limit=None, stop=None):
+        """
+        Search until no L-shape is monochromatic, or a limit is hit.
+
+        Parameters:
+            max_steps (int): Step limit.
+            tabu (int): Base tabu tenure.
+            noise (float): Probability of a random move.
+            restart_after (int): Steps without improvement before a restart.
+            restart_fraction (float): Fraction of the free cells recolored at random on a restart.
+            time_limit (float): Optional limit in seconds.
+            stop: Optional event; the search gives up once it is set.
+
+        Returns:
+            dict: 'status' ("SAT" or "UNKNOWN"), the best 'grid' found (colors
+            1..C), its number of monochromatic L-shapes ('violations'), and
+            the 'steps', 'restarts' and 'time' spent.
+        """
+        start = time.time()
+        best, best_grid = self.num_bad, self.color.copy()
+        last_improvement = self.steps
+        restarts = 0
+        end = self.steps + max_steps
+        while self.num_bad > 0 and self.steps < end:
+            if self.steps % 1000 == 0 and (time_limit is not None and time.time() - start > time_limit
+                                           or stop is not None and stop.is_set()):
+                break
+            if not self.step(tabu, noise, best):
+                if not self.free[self.shapes[self.bad_list[:self.num_bad]]].any():
+                    # Only fully fixed L-shapes are left violated
+                    break
+                continue
+            if self.num_bad < best:
+                best, best_grid = self.num_bad, self.color.copy()
+                last_improvement = self.steps
+            elif self.steps - last_improvement >= restart_after:
+                grid = best_grid + 1
+                kick = self.free & (self.rng.random(len(grid)) < restart_fraction)
+                grid[kick] = 0
+                self.reset(grid, fill="random")
+                self.tabu_until[:] = 0
+                last_improvement = self.steps
+                restarts += 1
+        if self.num_bad < best:
+            best, best_grid = self.num_bad, self.color.copy()
+        grid = (best_grid + 1).reshape(self.N, self.N)
+        return {"status": "SAT" if best == 0 else "UNKNOWN", "grid": grid, "violations": int(best),
+                "steps": int(self.steps), "restarts": restarts, "time": time.time() - start}
+
+
+def local_search(N, C, grid=None, fixed=None, seed=0, **kwargs):
+    """
+    Run one LocalSearch walker; keyword arguments go to LocalSearch.run.
+    """
+    return LocalSearch(N, C, grid, fixed, seed).run(**kwargs)
+
+
+def _init_walker(stop):
+    global _stop
+    _stop = stop
+
+
+def _walker(N, C, grid, fixed, seed, kwargs):
+    result = LocalSearch(N, C, grid, fixed, seed).run(stop=_stop, **kwargs)
+    result["seed"] = seed
+    if result["status"] == "SAT":
+        _stop.set()
+    return result
+
+
+def run_walkers(N, C, num_walkers=os.cpu_count(), grids=None, fixed=None, seed=0, **kwargs):
+    """
+    Run independent LocalSearch walkers in a process pool; the first solution stops the others.
+
+    Parameters:
+        N (int): The grid dimension.
+        C (int): Number of colors.
+        num_walkers (int): Number of walkers (and processes).
+        grids (list): Optional initial grids (a list or a (B, N, N) stack),
+            handed out to the walkers in turn (e.g. rotational grids from
+            cyclic_color.decode_rotated_models placed with hints.place); None
+            starts every walker from a random grid.
+        fixed (np.array): Optional N x N mask of cells never recolored.
+        seed (int): Walker i uses seed + i.
+        **kwargs: Passed to LocalSearch.run (max_steps, tabu, noise, ...).
+
+    Returns:
+        dict: The result of the walker that found a solution, or else the one
+        with the fewest violations, with its 'seed'.
+    """
+    if grids is None:
+        grids = [None]
+    stop = multiprocessing.Event()
+    best = None
+    with ProcessPoolExecutor(max_workers=num_walkers, initializer=_init_walker, initargs=(stop,)) as executor:
+        futures = [executor.submit(_walker, N, C, grids[i % len(grids)], fixed, seed + i, kwargs)
+                   for i in range(num_walkers)]
+        for future in as_completed(futures):
+            result = future.result()
+            if best is None or result["violations"] < best["violations"]:
+                best = result
+    if best["status"] == "SAT":
+        assert verify(best["grid"], C)
+    return best
+
+
+if __name__ == "__main__":
+    N, C = 17, 3
+    result = run_walkers(N, C, max_steps=10 ** 7, time_limit=600)
+    print(f"{result['status']}: {result['violations']} violations after {result['steps']} steps, "
+          f"{result['restarts']} restarts, {result['time']:.1f}s (seed {result['seed']})")
+    if result["status"] == "SAT":
+        np.save(f"lshape_{N}_{C}_local_search.npy", result["grid"])
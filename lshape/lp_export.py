@@ -0,0 +1,167 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+
+try:
+    from gurobipy import Model, GRB
+except ImportError:  # write_lp / write_mps do not need Gurobi
+    Model = GRB = None
+
+
+def clause_matrix(cnf):
+    """
+    Build the covering-constraint matrix of a CNF.
+
+    Clause i becomes the row  sum(x_pos) - sum(x_neg) >= 1 - (number of negative literals),
+    the linear form of  x_pos + ... + (1 - x_neg) + ... >= 1.
+
+    Parameters:
+        cnf (CNF): Clause store.
+
+    Returns:
+        tuple: (A, b) with A a (num_clauses, num_vars) scipy CSR matrix, column j
+        holding variable j + 1, and b the right-hand sides.
+    """
+    lits = cnf.lits
+    offsets = cnf.offsets
+    data = np.sign(lits).astype(np.int8)
+    A = csr_matrix((data, np.abs(lits) - 1, offsets), shape=(len(cnf), cnf.num_vars))
+    num_negative = np.add.reduceat((lits < 0).astype(np.int64), offsets[:-1]) if len(cnf) else np.zeros(0, int)
+    # reduceat returns the element itself for empty clauses; those have no negative literals
+    num_negative[np.diff(offsets) == 0] = 0
+    return A, 1 - num_negative
+
+
+def column_names(num_cols, col_ids=None):
+    """
+    Names x1, x2, ... of the columns, or x{col_ids[j]} when variable numbers are given.
+    """
+    col_ids = np.arange(num_cols) + 1 if col_ids is None else np.asarray(col_ids)
+    return np.char.add("x", col_ids.astype(str))
+
+
+def join_rows(pieces, starts, ends, prefixes, suffixes):
+    """
+    Concatenate per-entry strings into lines, with a prefix before and a suffix after each row.
+    """
+    idx = np.stack([starts, ends], axis=1).ravel()
+    vals = np.stack([prefixes, suffixes], axis=1).ravel()
+    return "".join(np.insert(pieces.astype(object), idx, vals.astype(object)).tolist())
+
+
+def write_lp(A, b, filename, senses=None, binaries=None, col_ids=None, chunk_size=65536, name="SAT_to_LP"):
+    """
+    Stream a feasibility model  A x (sense) b, x binary, as a CPLEX LP file.
+
+    Parameters:
+        A (scipy.sparse matrix): Constraint matrix, column j is variable x{j + 1}.
+        b (np.array): Right-hand sides.
+        senses (np.array): Optional row senses (">=", "<=" or "="); default ">=".
+        binaries (np.array): Columns declared binary; default every column used by A.
+        col_ids (np.array): Optional variable number of each column (column j is x{col_ids[j]}).
+        chunk_size (int): Number of rows formatted per write.
+        name (str): Problem name written as a comment.
+    """
+    A = A.tocsr()
+    b = np.asarray(b)
+    senses = np.full(A.shape[0], ">=") if senses is None else np.asarray(senses)
+    binaries = np.unique(A.indices) if binaries is None else np.asarray(binaries)
+    names = column_names(A.shape[1], col_ids)
+
+    with open(filename, "w") as f:
+        f.write(f"\\ {name}\nMinimize\n obj: 0 {names[binaries[0]] if len(binaries) else 'x1'}\nSubject To\n")
+        for start in range(0, A.shape[0], chunk_size):
+            stop = min(start + chunk_size, A.shape[0])
+            indptr = A.indptr[start:stop + 1]
+            data = A.data[indptr[0]:indptr[-1]]
+            cols = A.indices[indptr[0]:indptr[-1]]
+            coeffs = np.where(data == 1, " + ", np.where(data == -1, " - ", np.char.add(
+                np.where(data < 0, " - ", " + "), np.char.add(np.abs(data).astype(str), " "))))
+            terms = np.char.add(coeffs, names[cols])
+            rows = np.arange(start, stop)
+            prefixes = np.char.add(np.char.add(" R", rows.astype(str)), ":")
+            suffixes = np.char.add(np.char.add(np.char.add(" ", senses[start:stop]), " "),
+                                   np.char.add(b[start:stop].astype(str), "\n"))
+            f.write(join_rows(terms, indptr[:-1] - indptr[0], indptr[1:] - indptr[0], prefixes, suffixes))
+        f.write("Binaries\n")
+        for start in range(0, len(binaries), chunk_size):
+            f.write(" " + " ".join(names[binaries[start:start + chunk_size]].tolist()) + "\n")
+        f.write("End\n")
+
+
+def write_mps(A, b, filename, senses=None, binaries=None, col_ids=None, chunk_size=65536, name="SAT_TO_LP"):
+    """
+    Stream a feasibility model  A x (sense) b, x binary, as a free-format MPS file.
+
+    Parameters are the same as for write_lp.
+    """
+    A = A.tocsc()
+    b = np.asarray(b)
+    senses = np.full(A.shape[0], ">=") if senses is None else np.asarray(senses)
+    binaries = np.flatnonzero(np.diff(A.indptr)) if binaries is None else np.asarray(binaries)
+    row_names = np.char.add("R", np.arange(A.shape[0]).astype(str))
+    col_names = column_names(A.shape[1], col_ids)
+    row_types = np.select([senses == ">=", senses == "<="], ["G", "L"], "E")
+
+    with open(filename, "w") as f:
+        f.write(f"NAME {name}\nROWS\n N OBJ\n")
+        for start in range(0, A.shape[0], chunk_size):
+            stop = min(start + chunk_size, A.shape[0])
+            lines = np.char.add(np.char.add(np.char.add(" ", row_types[start:stop]), " "), row_names[start:stop])
+            f.write("\n".join(lines.tolist()) + "\n")
+
+        # Column-wise nonzeros, wrapped in integer markers (binaries also get BV bounds)
+        f.write("COLUMNS\n MARKER 'MARKER' 'INTORG'\n")
+        for start in range(0, A.shape[1], chunk_size):
+            stop = min(start + chunk_size, A.shape[1])
+            indptr = A.indptr[start:stop + 1]
+            cols = np.repeat(np.arange(start, stop), np.diff(indptr))
+            rows = A.indices[indptr[0]:indptr[-1]]
+            data = A.data[indptr[0]:indptr[-1]]
+            if len(rows) == 0:
+                continue
+            lines = np.char.add(np.char.add(np.char.add(" ", col_names[cols]), " "),
+                                np.char.add(np.char.add(row_names[rows], " "), data.astype(str)))
+            f.write("\n".join(lines.tolist()) + "\n")
+        f.write(" MARKER 'MARKER' 'INTEND'\n")
+
+        f.write("RHS\n")
+        nonzero = np.flatnonzero(b)
+        for start in range(0, len(nonzero), chunk_size):
+            rows = nonzero[start:start + chunk_size]
+            lines = np.char.add(np.char.add(" RHS ", row_names[rows]), np.char.add(" ", b[rows].astype(str)))
+            f.write("\n".join(lines.tolist()) + "\n")
+
+        f.write("BOUNDS\n")
+        for start in range(0, len(binaries), chunk_size):
+            cols = binaries[start:start + chunk_size]
+            f.write("\n".join(np.char.add(" BV BND ", col_names[cols]).tolist()) + "\n")
+        f.write("ENDATA\n")
+
+
+def write_model(A, b, filename, senses=None, col_ids=None, use_gurobi=False, chunk_size=65536, name="SAT_to_LP"):
+    """
+    Write the binary feasibility model  A x (sense) b  as LP or MPS (by file extension).
+
+    Parameters:
+        A (scipy.sparse matrix): Constraint matrix.
+        b (np.array): Right-hand sides.
+        senses (np.array): Optional row senses (">=", "<=" or "="); default ">=".
+        col_ids (np.array): Optional variable number of each column.
+        use_gurobi (bool): Build the model with Gurobi's matrix API (addMVar /
+            addMConstr) and let Gurobi write it, instead of the text writers.
+        chunk_size (int): Rows (or columns, for MPS) formatted per write.
+        name (str): Model name.
+    """
+    if use_gurobi:
+        if Model is None:
+            raise ImportError("use_gurobi=True requires gurobipy")
+        senses = np.full(A.shape[0], ">=") if senses is None else np.asarray(senses)
+        model = Model(name)
+        x = model.addMVar(A.shape[1], vtype=GRB.BINARY, name=column_names(A.shape[1], col_ids))
+        model.addMConstr(A, x, np.asarray([sense[0] for sense in senses]), b)
+        model.update()
+        model.write(filename)
+    elif filename.endswith(".mps"):
+        write_mps(A, b, filename, senses=senses, col_ids=col_ids, chunk_size=chunk_size, name=name.upper())
+    else:
+        write_lp(A, b, filename, senses=senses, col_ids=col_ids, chunk_size=chunk_size, name=name)
@@ -1,5 +1,8 @@
-import itertools
-from sympy.combinatorics import Permutation, PermutationGroup
+import numpy as np
+from .cnf import CNF
+from .permutations import orbit
+from .dimacs import DimacsWriter
+from .symmetry_breaking import symmetry_breaking_blocks, sorted_only_blocks, num_symmetry_breaking_clauses
 
 # A helper: get the Dimacs CNF variable number for the variable v {r,c,v} 
 # encoding the fact that the cell at (r,c) has the value v
@@ -7,7 +10,100 @@ def var(r, c, v, N, C):
     assert(1 <= r <= N and 1 <= c <= N and 1 <= v <= C) 
     return (r - 1) * N * C + (c - 1) * C + (v - 1) + 1
 
-def lshape_to_cnf(N, C, filename="lshape.cnf"):
+def lshape_cells(N):
+    """
+    Enumerate every L-shape of the N x N grid as three flat cell indices.
+
+    An L-shape with corner (r, c) and leg length i covers the cells (r, c),
+    (r + i, c) and (r + i, c + i). Cells are numbered 0-based as r * N + c.
+
+    Parameters:
+        N (int): The dimension of the grid.
+
+    Returns:
+        np.array: A (K, 3) int32 array, one L-shape per row, ordered by (r, c, i).
+    """
+    r, c, i = np.indices((N, N, N)).reshape(3, -1)
+    keep = (i >= 1) & (np.maximum(r, c) + i <= N - 1)
+    r, c, i = r[keep], c[keep], i[keep]
+    return np.stack([r * N + c, (r + i) * N + c, (r + i) * N + c + i], axis=1).astype(np.int32)
+
+def cell_lshapes(N):
+    """
+    For every cell, the L-shapes through it and the other two cells of each, in CSR form.
+
+    Parameters:
+        N (int): The dimension of the grid.
+
+    Returns:
+        tuple: (indptr, incident, others). The L-shapes through flat cell p are
+        incident[indptr[p]:indptr[p + 1]] (row indices of lshape_cells(N)), and
+        the matching rows of the (3K, 2) array others hold their two other cells.
+    """
+    shapes = lshape_cells(N).astype(np.int64)
+    flat = shapes.ravel()
+    order = np.argsort(flat, kind="stable")
+    incident, position = np.divmod(order, 3)
+    others = shapes[incident[:, None], (position[:, None] + [1, 2]) % 3]
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(flat, minlength=N * N))])
+    return indptr, incident, others
+
+def lshape_cnf(N, C, symmetry_breaking=(), sorted_only=()):
+    """
+    Generate the L-shape constraints with NumPy index arithmetic.
+
+    The variable of cell (r, c) with value v is var(r, c, v, N, C), i.e. the
+    literal of the 0-based flat cell index k and 0-based value v is k * C + v + 1.
+    Clauses are grouped by kind: at-least-one, at-most-one, no-L-shape, then the
+    optional symmetry-breaking predicates and sorted-only constraints, whose
+    auxiliary variables follow the N * N * C cell variables.
+
+    Parameters:
+        N (int): The dimension of the grid.
+        C (int): Number of possible values per cell.
+        symmetry_breaking (iterable): Symmetry kinds to break up front; only
+            "colors" (see symmetry_breaking_blocks).
+        sorted_only (iterable): Keep only solutions with sorted "rows" and/or
+            "cols" (see sorted_only_blocks). Not symmetry breaking: solutions
+            are lost, so never use it to enumerate solution classes.
+
+    Returns:
+        CNF: Clause store holding all clauses.
+    """
+    cells = np.arange(N * N, dtype=np.int32) * C + 1
+    values = np.arange(C, dtype=np.int32)
+
+    # 1. Every cell has at least one value
+    at_least_one = cells[:, None] + values
+
+    # 2. Every cell has at most one value
+    v, w = np.triu_indices(C, k=1)
+    at_most_one = -np.stack([at_least_one[:, v], at_least_one[:, w]], axis=-1).reshape(-1, 2)
+
+    # 3. No monochromatic L-shapes
+    triples = lshape_cells(N) * C + 1
+    no_lshape = -(triples[:, None, :] + values[None, :, None]).reshape(-1, 3)
+
+    # 4. Optional value-precedence constraints
+    sb_blocks, num_aux = symmetry_breaking_blocks(N, C, symmetry_breaking, N * N * C + 1)
+
+    # 5. Optional sorted-only lex constraints
+    sorted_blocks, num_sorted_aux = sorted_only_blocks(N, C, sorted_only, N * N * C + num_aux + 1)
+    num_aux += num_sorted_aux
+
+    return CNF.from_blocks(N * N * C + num_aux, [at_least_one, at_most_one, no_lshape, *sb_blocks, *sorted_blocks])
+
+def num_lshape_clauses(N, C, symmetry_breaking=(), sorted_only=()):
+    """
+    Closed-form number of clauses produced by lshape_cnf(N, C, symmetry_breaking, sorted_only).
+
+    Corners with max(r, c) = m (2m - 1 of them) admit N - m leg lengths.
+    """
+    num_lshapes = sum((2 * m - 1) * (N - m) for m in range(1, N + 1))
+    return (N * N + N * N * C * (C - 1) // 2 + num_lshapes * C
+            + num_symmetry_breaking_clauses(N, C, symmetry_breaking, sorted_only))
+
+def lshape_to_cnf(N, C, filename="lshape.cnf", symmetry_breaking=(), sorted_only=()):
     """
     Encode L-shape avoidance into a CNF file.
 
@@ -15,85 +111,28 @@ def lshape_to_cnf(N, C, filename="lshape.cnf"):
         N (int): The dimension of the grid.
         C (int): The number of possible values per cell (e.g., colors or labels).
         filename (str): The name of the file to output the CNF formula.
+        symmetry_breaking (iterable): Symmetry kinds to break, see lshape_cnf.
+        sorted_only (iterable): Sorted-only axes, see lshape_cnf.
     """
-    # Total variables in the CNF: N * N * C (number of cells * number of possible values)
-    num_variables = N * N * C
-    num_clauses = 0  # Count the number of clauses
-
-    with open(filename, "w") as f:
-        # Iterate over the grid cells
-        for r in range(1, N + 1): 
-            for c in range(1, N + 1):
-                # 1. The cell at (r, c) has at least one value
-                at_least_one_clause = [var(r, c, v, N, C) for v in range(1, C + 1)]
-                f.write(" ".join(map(str, at_least_one_clause)) + " 0\n")
-                num_clauses += 1
-
-                # 2. The cell at (r, c) has at most one value (no two values can be true simultaneously)
-                for v in range(1, C + 1):
-                    for w in range(v + 1, C + 1):
-                        at_most_one_clause = [-var(r, c, v, N, C), -var(r, c, w, N, C)]
-                        f.write(" ".join(map(str, at_most_one_clause)) + " 0\n")
-                        num_clauses += 1
-
-                # 3. No L-shapes in the grid
-                if c > r:
-                    for i in range(1, N - c + 1):
-                        for v in range(1, C + 1):
-                            no_lshape_clause = [-var(r, c, v, N, C), -var(r + i, c, v, N, C), -var(r + i, c + i, v, N, C)]
-                            f.write(" ".join(map(str, no_lshape_clause)) + " 0\n")
-                            num_clauses += 1
-                else:
-                    for i in range(1, N - r + 1):
-                        for v in range(1, C + 1):
-                            no_lshape_clause = [-var(r, c, v, N, C), -var(r + i, c, v, N, C), -var(r + i, c + i, v, N, C)]
-                            f.write(" ".join(map(str, no_lshape_clause)) + " 0\n")
-                            num_clauses += 1
-
-    # Write CNF header (at the beginning of the file)
-    with open(filename, "r+") as f:
-        content = f.read()
-        f.seek(0, 0)
-        f.write(f"p cnf {num_variables} {num_clauses}\n" + content)
-
-def generate_lshape_constraints(N, C):
+    cnf = lshape_cnf(N, C, symmetry_breaking, sorted_only)
+    num_clauses = num_lshape_clauses(N, C, symmetry_breaking, sorted_only)
+
+    with DimacsWriter(filename, cnf.num_vars, num_clauses=num_clauses) as writer:
+        writer.add_cnf(cnf)
+
+def generate_lshape_constraints(N, C, symmetry_breaking=()):
     """
     Generate the initial L-shape constraints as a list of clauses.
 
     Parameters:
         N (int): The dimension of the grid.
         C (int): Number of possible values per cell.
+        symmetry_breaking (iterable): Symmetry kinds to break, see lshape_cnf.
 
     Returns:
         list of lists: List of clauses for initial constraints.
     """
-    clauses = []
-
-    for r in range(1, N + 1):
-        for c in range(1, N + 1):
-            # 1. The cell at (r, c) has at least one value
-            at_least_one_clause = [var(r, c, v, N, C) for v in range(1, C + 1)]
-            clauses.append(at_least_one_clause)
-
-            # 2. The cell at (r, c) has at most one value (no two values can be true simultaneously)
-            for v in range(1, C + 1):
-                for w in range(v + 1, C + 1):
-                    at_most_one_clause = [-var(r, c, v, N, C), -var(r, c, w, N, C)]
-                    clauses.append(at_most_one_clause)
-
-            # 3. No L-shapes in the grid
-            if c > r:
-                for i in range(1, N - c + 1):
-                    for v in range(1, C + 1):
-                        no_lshape_clause = [-var(r, c, v, N, C), -var(r + i, c, v, N, C), -var(r + i, c + i, v, N, C)]
-                        clauses.append(no_lshape_clause)
-            else:
-                for i in range(1, N - r + 1):
-                    for v in range(1, C + 1):
-                        no_lshape_clause = [-var(r, c, v, N, C), -var(r + i, c, v, N, C), -var(r + i, c + i, v, N, C)]
-                        clauses.append(no_lshape_clause)
-
-    return clauses
+    return lshape_cnf(N, C, symmetry_breaking).to_lists()
     
 def get_non_isomorphic_clauses(solution, N, C):
     """
@@ -119,29 +158,12 @@ def get_non_isomorphic_clauses(solution, N, C):
             v = ((literal - 1) % C) + 1
             grid[r - 1][c - 1] = v
 
-    # Define row and column permutation groups
-    row_group = PermutationGroup(*[Permutation(p) for p in itertools.permutations(range(N))])
-    col_group = PermutationGroup(*[Permutation(p) for p in itertools.permutations(range(N))])
-    color_group = PermutationGroup(*[Permutation(p) for p in itertools.permutations(range(C))])  
-
-    clauses = []
-
-    # Iterate over unique row, column, and color permutations
-    for row_perm in row_group.generate():
-        for col_perm in col_group.generate():
-            for color_perm in color_group.generate():
-                permuted_clauses = []
-                for r in range(N):
-                    for c in range(N):
-                        original_val = grid[r][c]
-                        perm_val = color_perm(original_val - 1) + 1  # Adjust for 0-based indexing in Permutation
-                        perm_r = row_perm(r)
-                        perm_c = col_perm(c)
-                        permuted_literal = var(perm_r + 1, perm_c + 1, perm_val, N, C)
-                        permuted_clauses.append(-permuted_literal)
-                clauses.append(permuted_clauses)
-
-    return clauses
+    # Apply every row, column and color permutation to the grid in one array operation
+    images = orbit(np.array(grid) - 1, C, color_perms=True).reshape(-1, N * N)
+    cells = np.arange(N * N) * C + 1
+    clauses = -(cells + images)
+
+    return clauses.tolist()
 
 
 
@@ -1,5 +1,5 @@
-import itertools
-from sympy.combinatorics import Permutation, PermutationGroup
+import numpy as np
+from .permutations import orbit
 # A helper: get the Dimacs CNF variable number for the variable v {r,c,v} 
 # encoding the fact that the cell at (r,c) has the value v
 def var(r, c, v, N, C):
@@ -33,27 +33,12 @@ class SATGridProcessor:
         Returns:
             list: A list of CNF clauses to prevent isomorphic solutions.
         """
-        # Define row and column permutation groups
-        row_group = PermutationGroup(*[Permutation(p) for p in itertools.permutations(range(self.N))])
-        col_group = PermutationGroup(*[Permutation(p) for p in itertools.permutations(range(self.N))])
+        # Apply every row and column permutation to the grid in one array operation
+        images = orbit(self.grid).reshape(-1, self.N * self.N)
+        cells = np.arange(self.N * self.N) * self.C
+        clauses = -(cells + images)
 
-        clauses = []
-
-        # Iterate over unique permutations from the group generators
-        for row_perm in row_group.generate():
-            for col_perm in col_group.generate():
-                permuted_clauses = []
-                for r in range(self.N):
-                    for c in range(self.N):
-                        original_val = self.grid[r][c]
-                        perm_r = row_perm(r) 
-                        perm_c = col_perm(c) 
-                        permuted_literal = var(perm_r + 1, perm_c + 1, original_val, self.N, self.C)
-                        permuted_clauses.append(-permuted_literal)
-
-                clauses.append(permuted_clauses)
-
-        return clauses
+        return clauses.tolist()
 
     def write_non_isomorphic_cnf(self, original_filename, new_filename):
         with open(original_filename, "r") as original_file:
@@ -0,0 +1,66 @@
+import itertools
+from functools import lru_cache
+import numpy as np
+
+
+@lru_cache(maxsize=None)
+def all_permutations(n):
+    """
+    Every permutation of range(n) as the rows of an index array.
+
+    The array is computed once per n and shared (it is read-only).
+
+    Parameters:
+        n (int): Number of points.
+
+    Returns:
+        np.array: (n!, n) int array, row p maps point i to p[i].
+    """
+    perms = np.array(list(itertools.permutations(range(n))), dtype=np.intp).reshape(-1, n)
+    perms.setflags(write=False)
+    return perms
+
+
+def permute_grid(grid, row_perms, col_perms, color_perms=None):
+    """
+    Apply every combination of row, column and color permutations to a grid at once.
+
+    Result [i, j, k] is the grid whose rows are taken in the order row_perms[i],
+    whose columns are taken in the order col_perms[j] and whose 0-based colors are
+    mapped through color_perms[k].
+
+    Parameters:
+        grid (np.array): N x N grid of 0-based colors.
+        row_perms (np.array): (R, N) row permutations.
+        col_perms (np.array): (S, N) column permutations.
+        color_perms (np.array): Optional (T, C) color permutations.
+
+    Returns:
+        np.array: (R, S, N, N) grids, or (R, S, T, N, N) with color_perms.
+    """
+    grid = np.asarray(grid)
+    permuted = grid[row_perms[:, None, :, None], col_perms[None, :, None, :]]
+    if color_perms is None:
+        return permuted
+    return np.asarray(color_perms)[:, permuted].transpose(1, 2, 0, 3, 4)
+
+
+def orbit(grid, C=None, color_perms=False):
+    """
+    All images of a grid under row, column and (optionally) color permutations.
+
+    Parameters:
+        grid (np.array): N x N grid of 0-based colors.
+        C (int): Number of colors; defaults to the largest color in the grid plus one.
+        color_perms (bool): Also apply all permutations of the C colors.
+
+    Returns:
+        np.array: (M, N, N) array of images (with repetitions), one per group element.
+    """
+    grid = np.asarray(grid)
+    N = grid.shape[0]
+    perms = all_permutations(N)
+    if not color_perms:
+        return permute_grid(grid, perms, perms).reshape(-1, N, N)
+    C = int(grid.max()) + 1 if C is None else C
+    return permute_grid(grid, perms, perms, all_permutations(C)).reshape(-1, N, N)
@@ -0,0 +1,235 @@
+import os
+import signal
+import subprocess
+import threading
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .cnf import CNF
+from .solver_log import parse_solver_output
+from .verify import verify_model
+
+# How to pass a random seed to the solvers we use, by executable name
+SEED_OPTIONS = {
+    "kissat": "--seed={}",
+    "cadical": "--seed={}",
+    "glucose": "-rnd-seed={}",
+    "glucose-syrup": "-rnd-seed={}",
+}
+
+
+def seeded_command(command, seed):
+    """
+    Append the solver's seed option to a command, if the solver is known to have one.
+    """
+    option = SEED_OPTIONS.get(os.path.basename(command[0]))
+    # Glucose wants a strictly positive seed
+    return list(command) + [option.format(seed + 1)] if option else list(command)
+
+
+def shuffle_cnf(cnf, rng):
+    """
+    Rename the variables, flip their polarities and reorder the clauses of a CNF.
+
+    The result is equisatisfiable, but a solver sees it as a different
+    instance, which decorrelates runs of the same solver and configuration.
+
+    Parameters:
+        cnf (CNF): Clause store.
+        rng (np.random.Generator): Random generator.
+
+    Returns:
+        tuple: (shuffled CNF, mapping) with mapping[v] the signed literal that
+        replaced variable v (mapping[0] unused).
+    """
+    mapping = np.zeros(cnf.num_vars + 1, dtype=np.int64)
+    mapping[1:] = (rng.permutation(cnf.num_vars) + 1) * rng.choice([-1, 1], cnf.num_vars)
+    lits = np.sign(cnf.lits) * mapping[np.abs(cnf.lits)]
+
+    order = rng.permutation(len(cnf))
+    lengths = np.diff(cnf.offsets)[order]
+    starts = cnf.offsets[:-1][order]
+    # Gather the literals of the clauses in their new order
+    idx = np.repeat(starts - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths) + np.arange(lengths.sum())
+    shuffled = CNF(cnf.num_vars)
+    shuffled._lits = lits[idx].astype(np.int32)
+    shuffled._offsets = np.concatenate([[0], np.cumsum(lengths)])
+    return shuffled, mapping
+
+
+def unshuffle_model(model, mapping):
+    """
+    Translate a model of a shuffled CNF back to the original variables.
+    """
+    model = np.asarray(model, dtype=np.int64)
+    value = np.zeros(len(mapping) + 1, dtype=bool)
+    value[np.abs(model)] = model > 0
+    # Variable v is true if the literal that replaced it is true
+    lits = np.arange(1, len(mapping))
+    true = value[np.abs(mapping[1:])] == (mapping[1:] > 0)
+    return np.where(true, lits, -lits)
+
+
+def top_configs(results, k=4, binary="kissat/build/kissat", time_limit=None):
+    """
+    Turn the k fastest configurations of a grid search into Kissat commands.
+
+    Parameters:
+        results (pd.DataFrame): Grid search results (parameter columns, then
+            'runtime' and 'return_code'), e.g. runtime_grid_search_20.csv.
+        k (int): Number of configurations.
+        binary (str): Kissat executable.
+        time_limit (int): Optional --time limit.
+
+    Returns:
+        list: Commands (lists of arguments, without the CNF file).
+    """
+    solved = results[results['return_code'].isin([10, 20])].sort_values('runtime')
+    params = [col for col in results.columns if col.startswith('--')]
+    commands = []
+    for _, row in solved.head(k).iterrows():
+        command = [binary] + ([f"--time={time_limit}"] if time_limit else [])
+        commands.append(command + [f"{key}={int(row[key])}" for key in params])
+    return commands
+
+
+class Portfolio:
+    """
+    Run several solver commands on the same instance at once; the first
+    definite answer wins and every other run is terminated.
+
+    Each solver runs in its own process group, so killing the group also stops
+    anything the solver spawned (e.g. parkissat's workers).
+    """
+
+    def __init__(self):
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.procs = set()
+
+    def run(self, index, command, filename):
+        """
+        Run one member of the portfolio; returns (index, SolverResult or None if cancelled).
+        """
+        with self.lock:
+            if self.stop.is_set():
+                return index, None
+            try:
+                proc = subprocess.Popen(command + [filename], stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                        text=True, start_new_session=True)
+            except OSError as e:
+                print(f"{' '.join(command)}: {e}")
+                return index, None
+            self.procs.add(proc)
+        output, _ = proc.communicate()
+        with self.lock:
+            self.procs.discard(proc)
+            if self.stop.is_set() and proc.returncode not in (10, 20):
+                return index, None
+        return index, parse_solver_output(output, proc.returncode)
+
+    def cancel(self):
+        """
+        Stop every running solver.
+        """
+        with self.lock:
+            self.stop.set()
+            for proc in self.procs:
+                try:
+                    os.killpg(proc.pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+
+
+def run_portfolio(cnf, commands, N=None, C=None, shuffle=True, seed=0, workdir="."):
+    """
+    Solve one instance with a portfolio of solvers and configurations.
+
+    Every command gets its own seed (through the solver's seed option, see
+    SEED_OPTIONS) and, with shuffle, its own renamed and reordered copy of the
+    formula. The first run to report SAT or UNSAT wins and the others are
+    killed. A SAT model is translated back to the original variables and, when
+    N and C are given, checked with the L-shape verifier; a model that fails
+    the check is discarded and the portfolio keeps waiting.
+
+    Parameters:
+        cnf (CNF or str): Clause store or DIMACS filename.
+        commands (list): Solver commands (lists of arguments, without the CNF
+            file), e.g. from top_configs plus other DIMACS solvers.
+        N (int): Grid size, to verify L-shape models.
+        C (int): Number of colors, to verify L-shape models.
+        shuffle (bool): Give every run its own shuffled copy of the formula.
+        seed (int): Base seed; run i uses seed + i.
+        workdir (str): Directory for the temporary CNF files.
+
+    Returns:
+        dict: 'status' ("SAT", "UNSAT" or "UNKNOWN"), 'model' (original
+        variables, or None), 'command' of the winner, its SolverResult as
+        'result' and the wall-clock 'time'.
+    """
+    if isinstance(cnf, str):
+        if shuffle:
+            cnf = CNF.from_file(cnf)
+        else:
+            filename = cnf
+    start = time.time()
+
+    runs = []
+    temp_files = []
+    if not shuffle and isinstance(cnf, CNF):
+        filename = os.path.join(workdir, f"portfolio_{os.getpid()}.cnf")
+        cnf.to_file(filename)
+        temp_files.append(filename)
+    for i, command in enumerate(commands):
+        mapping = None
+        if shuffle:
+            shuffled, mapping = shuffle_cnf(cnf, np.random.default_rng(seed + i))
+            filename = os.path.join(workdir, f"portfolio_{os.getpid()}_{i}.cnf")
+            shuffled.to_file(filename)
+            temp_files.append(filename)
+        runs.append((seeded_command(command, seed + i), filename, mapping))
+
+    portfolio = Portfolio()
+    answer = {"status": "UNKNOWN", "model": None, "command": None, "result": None}
+    try:
+        with ThreadPoolExecutor(max_workers=len(runs)) as executor:
+            futures = [executor.submit(portfolio.run, i, command, filename)
+                       for i, (command, filename, _) in enumerate(runs)]
+            # Leaving the with block waits for every member, so stop them first,
+            # also when a member raised or on KeyboardInterrupt
+            try:
+                for future in as_completed(futures):
+                    i, result = future.result()
+                    if result is None or result.status == "UNKNOWN":
+                        continue
+                    model = None
+                    if result.status == "SAT":
+                        if result.model is None:
+                            continue
+                        mapping = runs[i][2]
+                        model = unshuffle_model(result.model, mapping) if mapping is not None else result.model
+                        if N is not None and not verify_model(model, N, C):
+                            print(f"{' '.join(runs[i][0])}: model fails verification, ignoring it.")
+                            continue
+                    answer = {"status": result.status, "model": model, "command": runs[i][0], "result": result}
+                    break
+            finally:
+                for future in futures:
+                    future.cancel()
+                portfolio.cancel()
+    finally:
+        for filename in temp_files:
+            os.remove(filename)
+    answer["time"] = time.time() - start
+    return answer
+
+
+if __name__ == "__main__":
+    import pandas as pd
+    from .lshape_to_cnf import lshape_cnf
+
+    N, C = 20, 3
+    commands = top_configs(pd.read_csv("runtime_grid_search_20.csv"), k=6)
+    commands += [["cadical/build/cadical", "-q"], ["glucose/parallel/glucose-syrup", "-model"]]
+    answer = run_portfolio(lshape_cnf(N, C), commands, N=N, C=C)
+    print(f"{answer['status']} in {answer['time']:.1f}s by {' '.join(answer['command'] or [])}")
@@ -0,0 +1,147 @@
+import re
+from dataclasses import dataclass, field
+import numpy as np
+from .dimacs import mask_lines, parse_ints
+
+# Banner fragments identifying the solver that wrote a log
+SOLVERS = (
+    ("parkissat", re.compile(r"painless|parkissat", re.I)),
+    ("kissat", re.compile(r"^c Kissat", re.M)),
+    ("cadical", re.compile(r"^c CaDiCaL", re.M)),
+    ("glucose", re.compile(r"glucose", re.I)),
+)
+
+# Statistic names (normalized, see parse_stats) holding the solve time in seconds
+TIME_KEYS = ("process-time", "total-process-time-since-initialization", "cpu-time", "resolution-time")
+
+# "c <name>: <value> ..." lines; the name may contain spaces (CaDiCaL, Glucose)
+STAT_LINE = re.compile(r"^c[ \t]+(?:\[[^\]]*\][ \t]*)?([A-Za-z][A-Za-z0-9 _/-]*?)[ \t]*:[ \t]+(-?[0-9][0-9.eE+]*)(.*)$", re.M)
+SECONDS = re.compile(r"(-?[0-9][0-9.]*)\s+(?:seconds|s)\b")
+STATUS_LINE = re.compile(r"^s\s+(SATISFIABLE|UNSATISFIABLE|UNKNOWN)", re.M)
+EXIT_LINE = re.compile(r"^c exit (\d+)", re.M)
+
+
+@dataclass
+class SolverResult:
+    """
+    Everything a DIMACS solver reported about one run.
+
+    status is "SAT", "UNSAT" or "UNKNOWN"; time is the process time in seconds
+    and the counters are None when the log does not report them. stats holds
+    every "c name: value" statistic of the log under its normalized name, and
+    model the literals of the 'v' lines (None if there are none).
+    """
+    solver: str = "unknown"
+    status: str = "UNKNOWN"
+    exit_code: int = None
+    time: float = None
+    conflicts: int = None
+    decisions: int = None
+    propagations: int = None
+    restarts: int = None
+    stats: dict = field(default_factory=dict)
+    model: np.ndarray = None
+
+    @property
+    def conflicts_per_sec(self):
+        return self.conflicts / self.time if self.conflicts is not None and self.time else None
+
+    @property
+    def propagations_per_sec(self):
+        return self.propagations / self.time if self.propagations is not None and self.time else None
+
+    def to_dict(self):
+        """
+        The record without the model, as plain Python values (e.g. for RunStore).
+        """
+        return {
+            "solver": self.solver, "status": self.status, "exit_code": self.exit_code, "time": self.time,
+            "conflicts": self.conflicts, "decisions": self.decisions, "propagations": self.propagations,
+            "restarts": self.restarts, "conflicts_per_sec": self.conflicts_per_sec,
+            "propagations_per_sec": self.propagations_per_sec, **self.stats,
+        }
+
+
+def detect_solver(output):
+    for name, pattern in SOLVERS:
+        if pattern.search(output):
+            return name
+    return "unknown"
+
+
+def parse_stats(output):
+    """
+    Collect the numeric "c name: value" statistics of a log.
+
+    Names are lower-cased with spaces turned into dashes, so Kissat's
+    "process-time", CaDiCaL's "total process time since initialization" and
+    Glucose's "CPU time" all end up in the same style. When a line reports a
+    duration ("... 12.3 seconds" or "12.3 s") the number of seconds is kept,
+    otherwise the first number. A statistic repeated in the log keeps its
+    last value (the final statistics are printed last).
+    """
+    stats = {}
+    for name, value, rest in STAT_LINE.findall(output):
+        name = re.sub(r"[\s_]+", "-", name.strip().lower())
+        seconds = SECONDS.search(value + " " + rest)
+        text = seconds.group(1) if seconds else value
+        try:
+            number = float(text)
+        except ValueError:
+            continue
+        stats[name] = int(number) if number.is_integer() and "." not in text and "e" not in text.lower() else number
+    return stats
+
+
+def parse_model(output):
+    """
+    Return the literals of the 'v' lines as an int64 array (None if there are none).
+    """
+    buf = np.frombuffer(output.encode(), dtype=np.uint8)
+    if len(buf) == 0:
+        return None
+    lits = parse_ints(mask_lines(buf, b"v"))
+    return lits[lits != 0] if len(lits) else None
+
+
+def parse_solver_output(output, exit_code=None):
+    """
+    Parse the log of a Kissat, CaDiCaL, Glucose or parkissat run.
+
+    Parameters:
+        output (str): Everything the solver printed (stdout and stderr).
+        exit_code (int): Exit code of the process, if known; otherwise taken
+            from Kissat's "c exit" line.
+
+    Returns:
+        SolverResult: Status, time, counters, all statistics and the model.
+    """
+    result = SolverResult(solver=detect_solver(output))
+    status = STATUS_LINE.findall(output)
+    if status:
+        result.status = {"SATISFIABLE": "SAT", "UNSATISFIABLE": "UNSAT"}.get(status[-1], "UNKNOWN")
+    if exit_code is None:
+        exits = EXIT_LINE.findall(output)
+        exit_code = int(exits[-1]) if exits else None
+    result.exit_code = exit_code
+    if result.status == "UNKNOWN" and exit_code in (10, 20):
+        result.status = "SAT" if exit_code == 10 else "UNSAT"
+
+    result.stats = parse_stats(output)
+    for key in TIME_KEYS:
+        if key in result.stats:
+            result.time = float(result.stats[key])
+            break
+    for key in ("conflicts", "decisions", "propagations", "restarts"):
+        value = result.stats.get(key)
+        setattr(result, key, int(value) if value is not None else None)
+    result.model = parse_model(output)
+    return result
+
+
+def parse_solver_file(filename, exit_code=None):
+    """
+    Parse a solver log written to a file, see parse_solver_output.
+    """
+    with open(filename, errors="replace") as f:
+        return parse_solver_output(f.read(), exit_code)
@@ -0,0 +1,154 @@
+import numpy as np
+
+# Symmetry kinds understood by symmetry_breaking_blocks
+KINDS = ("colors",)
+
+# Lex orders of sorted_only_blocks; these are not symmetries of the L-shape problem
+SORTED_KINDS = ("rows", "cols")
+
+
+def lex_leq_blocks(A, B, first_aux):
+    """
+    Clauses forcing A <=lex B for a batch of Boolean vector pairs.
+
+    Auxiliary variable e[p, j] means "A[p] and B[p] agree on positions 0..j-1":
+        e[p, 0]
+        e[p, j] -> (-A[p, j] or B[p, j])
+        e[p, j] and (A[p, j] <-> B[p, j]) -> e[p, j + 1]
+
+    Parameters:
+        A, B (np.array): (P, L) arrays of DIMACS variables, one pair per row.
+        first_aux (int): First unused variable number.
+
+    Returns:
+        tuple: (list of clause blocks, number of auxiliary variables used).
+    """
+    P, L = A.shape
+    e = first_aux + np.arange(P * L, dtype=np.int32).reshape(P, L)
+    start = e[:, :1]
+    leq = np.stack([-e, -A, B], axis=-1).reshape(-1, 3)
+    keep_same_false = np.stack([-e[:, :-1], A[:, :-1], B[:, :-1], e[:, 1:]], axis=-1).reshape(-1, 4)
+    keep_same_true = np.stack([-e[:, :-1], -A[:, :-1], -B[:, :-1], e[:, 1:]], axis=-1).reshape(-1, 4)
+    return [start, leq, keep_same_false, keep_same_true], P * L
+
+
+def value_precedence_blocks(N, C, first_aux):
+    """
+    Value-precedence clauses breaking the color symmetry.
+
+    Cells are taken in row-major order; color v + 1 may only appear once color v
+    has appeared in an earlier cell, so colors are numbered by first occurrence.
+    Auxiliary variable u[k, v] means "color v is used in cells 0..k".
+
+    Parameters:
+        N (int): The dimension of the grid.
+        C (int): Number of colors.
+        first_aux (int): First unused variable number.
+
+    Returns:
+        tuple: (list of clause blocks, number of auxiliary variables used).
+    """
+    K = N * N
+    x = np.arange(K, dtype=np.int32)[:, None] * C + np.arange(C, dtype=np.int32) + 1
+    u = first_aux + np.arange(K * (C - 1), dtype=np.int32).reshape(K, C - 1)
+    blocks = [
+        # The first cell takes the first color
+        -x[0, 1:, None],
+        # u[0, v] <-> x[0, v]
+        np.stack([-u[0], x[0, :-1]], axis=-1),
+        # x[k, v] -> u[k, v]
+        np.stack([-x[:, :-1], u], axis=-1).reshape(-1, 2),
+        # u[k - 1, v] -> u[k, v]
+        np.stack([-u[:-1], u[1:]], axis=-1).reshape(-1, 2),
+        # u[k, v] -> u[k - 1, v] or x[k, v]
+        np.stack([-u[1:], u[:-1], x[1:, :-1]], axis=-1).reshape(-1, 3),
+        # x[k, v + 1] -> u[k - 1, v]
+        np.stack([-x[1:, 1:], u[:-1]], axis=-1).reshape(-1, 2),
+    ]
+    return blocks, K * (C - 1)
+
+
+def symmetry_breaking_blocks(N, C, kinds, first_aux):
+    """
+    Static symmetry-breaking predicates for the L-shape encoding.
+
+    Selectable kinds:
+        "colors": colors are numbered by first occurrence (value precedence).
+
+    Colors are a true symmetry of the L-shape clauses, so "colors" keeps exactly
+    one coloring per color class. Row and column orders are not symmetries (a
+    permutation of the rows does not map L-shapes to L-shapes) and are refused
+    here; see sorted_only_blocks.
+
+    Parameters:
+        N (int): The dimension of the grid.
+        C (int): Number of colors.
+        kinds (iterable): Subset of KINDS.
+        first_aux (int): First unused variable number.
+
+    Returns:
+        tuple: (list of clause blocks, number of auxiliary variables used).
+    """
+    kinds = set(kinds)
+    sorted_kinds = kinds & set(SORTED_KINDS)
+    if sorted_kinds:
+        raise ValueError(f"{sorted(sorted_kinds)} are not symmetries of the L-shape problem and would cut "
+                         f"solution classes; use the sorted_only option for sorted solutions")
+    unknown = kinds - set(KINDS)
+    if unknown:
+        raise ValueError(f"Unknown symmetry kinds: {sorted(unknown)}")
+    if "colors" not in kinds:
+        return [], 0
+    return value_precedence_blocks(N, C, first_aux)
+
+
+def sorted_only_blocks(N, C, axes, first_aux):
+    """
+    Lex-order constraints that keep only sorted solutions.
+
+    Selectable axes:
+        "rows": rows are in nondecreasing lex order (as one-hot vectors).
+        "cols": columns are in nondecreasing lex order.
+
+    This is not symmetry breaking: row and column permutations do not map
+    L-shapes to L-shapes, so a solution whose sorted form is not a solution is
+    simply lost. Use it to look for sorted solutions only, never to enumerate
+    solution classes.
+
+    Parameters:
+        N (int): The dimension of the grid.
+        C (int): Number of colors.
+        axes (iterable): Subset of SORTED_KINDS.
+        first_aux (int): First unused variable number.
+
+    Returns:
+        tuple: (list of clause blocks, number of auxiliary variables used).
+    """
+    axes = set(axes)
+    unknown = axes - set(SORTED_KINDS)
+    if unknown:
+        raise ValueError(f"Unknown sorted-only axes: {sorted(unknown)}")
+
+    x = np.arange(N * N * C, dtype=np.int32).reshape(N, N, C) + 1
+    blocks, num_aux = [], 0
+    for axis in SORTED_KINDS:
+        if axis not in axes:
+            continue
+        lines = x if axis == "rows" else x.transpose(1, 0, 2)
+        lines = lines.reshape(N, N * C)
+        new_blocks, used = lex_leq_blocks(lines[:-1], lines[1:], first_aux + num_aux)
+        blocks.extend(new_blocks)
+        num_aux += used
+    return blocks, num_aux
+
+
+def num_symmetry_breaking_clauses(N, C, kinds, sorted_only=()):
+    """
+    Closed-form number of clauses produced by symmetry_breaking_blocks (and sorted_only_blocks).
+    """
+    L = N * C
+    count = 0
+    if "colors" in kinds:
+        count += (C - 1) * (4 * N * N - 1)
+    count += len(set(sorted_only) & set(SORTED_KINDS)) * (N - 1) * (3 * L - 1)
+    return count
@@ -0,0 +1,67 @@
+import numpy as np
+from .lshape_to_cnf import lshape_cells
+
+
+def monochromatic_lshapes(grids):
+    """
+    Flag the monochromatic L-shapes of one grid or a batch of grids.
+
+    Parameters:
+        grids: N x N grid or (B, N, N) stack of grids.
+
+    Returns:
+        np.array: Boolean array of shape (K,) or (B, K), aligned with lshape_cells(N).
+    """
+    grids = np.asarray(grids)
+    N = grids.shape[-1]
+    flat = grids.reshape(grids.shape[:-2] + (N * N,))
+    a, b, c = np.moveaxis(flat[..., lshape_cells(N)], -1, 0)
+    return (a == b) & (b == c)
+
+
+def verify(grids, C=None):
+    """
+    Check that complete grids are valid L-shape colorings.
+
+    A grid is valid when every cell holds a color in 1..C and no L-shape
+    (r, c), (r + i, c), (r + i, c + i) is monochromatic.
+
+    Parameters:
+        grids: N x N grid (2D list or array) or (B, N, N) stack of grids.
+        C (int): Number of colors; if None, cell values are not range-checked.
+
+    Returns:
+        bool or np.array: True/False for a single grid, a boolean array of shape (B,) for a batch.
+    """
+    grids = np.asarray(grids)
+    valid = ~monochromatic_lshapes(grids).any(axis=-1)
+    if C is not None:
+        valid &= ((grids >= 1) & (grids <= C)).all(axis=(-2, -1))
+    return bool(valid) if grids.ndim == 2 else valid
+
+
+def verify_model(model, N, C):
+    """
+    Check a SAT model (e.g. the 'v' lines of parkissat) against the L-shape problem.
+
+    The model must set exactly one value per cell and contain no monochromatic L-shape.
+    Literals above N * N * C (auxiliary variables) are ignored.
+
+    Parameters:
+        model (list, np.array or str): Model literals.
+        N (int): The grid dimension.
+        C (int): Number of possible values per cell.
+
+    Returns:
+        bool: True if the model is a valid certificate.
+    """
+    if isinstance(model, str):
+        model = model.split()
+    lits = np.asarray(model, dtype=np.int64)
+    lits = lits[(lits > 0) & (lits <= N * N * C)] - 1
+    counts = np.bincount(lits // C, minlength=N * N)
+    if not (counts == 1).all():
+        return False
+    grid = np.zeros(N * N, dtype=np.int64)
+    grid[lits // C] = lits % C + 1
+    return verify(grid.reshape(N, N), C)
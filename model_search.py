@@ -0,0 +1,281 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import math
+import pandas as pd
+import numpy as np
+from scipy.linalg import cho_factor, cho_solve
+from scipy.optimize import minimize
+from scipy.stats import norm
+from tqdm import tqdm
+from grid_search import keys, num_workers, run_kissat
+
+# Search space: (low, high, kind). "bool" and "int" values are searched as
+# they are, "log" ranges on a log(1 + x) scale; every range contains both
+# values of param_grid.
+param_space = {
+    '--ands': (0, 1, "bool"),
+    '--bumpreasonsrate': (1, 100, "log"),
+    '--chrono': (0, 1, "bool"),
+    '--eliminateint': (10, 5000, "log"),
+    '--eliminateocclim': (10, 20000, "log"),
+    '--forwardeffort': (10, 1000, "log"),
+    '--ifthenelse': (0, 1, "bool"),
+    '--probeint': (2, 1000, "log"),
+    '--rephaseint': (10, 10000, "log"),
+    '--stable': (0, 2, "int"),
+    '--substituteeffort': (1, 100, "log"),
+    '--subsumeocclim': (1, 10000, "log"),
+    '--vivifyeffort': (10, 1000, "log"),
+}
+assert list(param_space) == keys
+
+
+def encode(configs, N):
+    """
+    Map configurations (one row per configuration, in param_grid order) and
+    instance sizes to the unit cube used by the surrogate.
+
+    The last column is the instance size, scaled so that 18..21 spans one unit.
+    """
+    configs = np.asarray(configs, dtype=float)
+    X = np.empty((configs.shape[0], len(keys) + 1))
+    for j, key in enumerate(keys):
+        low, high, kind = param_space[key]
+        scale = np.log1p if kind == "log" else (lambda x: x)
+        X[:, j] = (scale(configs[:, j]) - scale(low)) / (scale(high) - scale(low))
+    X[:, -1] = (np.asarray(N, dtype=float) - 18) / 3
+    return X
+
+
+def sample_configs(rng, n):
+    """
+    Draw n random configurations from param_space.
+    """
+    configs = np.empty((n, len(keys)))
+    for j, key in enumerate(keys):
+        low, high, kind = param_space[key]
+        if kind == "log":
+            configs[:, j] = np.round(np.expm1(rng.uniform(np.log1p(low), np.log1p(high), n)))
+        else:
+            configs[:, j] = rng.integers(low, high + 1, n)
+    return configs
+
+
+def perturb(rng, configs, n, scale=0.1):
+    """
+    Draw n neighbours of the given configurations (local moves around the incumbents).
+    """
+    base = configs[rng.integers(len(configs), size=n)].copy()
+    for j, key in enumerate(keys):
+        low, high, kind = param_space[key]
+        if kind == "log":
+            step = rng.normal(0, scale * (np.log1p(high) - np.log1p(low)), n)
+            base[:, j] = np.round(np.expm1(np.clip(np.log1p(base[:, j]) + step, np.log1p(low), np.log1p(high))))
+        else:
+            flip = rng.random(n) < 1 / len(keys)
+            base[flip, j] = rng.integers(low, high + 1, flip.sum())
+    return base
+
+
+class GaussianProcess:
+    """
+    Gaussian process regression with an ARD squared-exponential kernel.
+
+    The posterior is conditioned on at most max_points observations and the
+    hyperparameters (one lengthscale per input, signal and noise variance) are
+    fitted by maximizing the marginal likelihood on fit_points of them, which
+    keeps the Cholesky factorizations cheap.
+    """
+
+    def __init__(self, max_points=1500, fit_points=400, seed=0):
+        self.max_points = max_points
+        self.fit_points = fit_points
+        self.rng = np.random.default_rng(seed)
+
+    def kernel(self, A, B):
+        A = A / self.lengthscales
+        B = B / self.lengthscales
+        sq = np.sum(A * A, axis=1)[:, None] + np.sum(B * B, axis=1)[None, :] - 2 * A @ B.T
+        return self.signal * np.exp(-0.5 * np.maximum(sq, 0))
+
+    def subsample(self, X, y):
+        """
+        Keep the best quarter of the observations and a random sample of the rest.
+        """
+        if len(y) <= self.max_points:
+            return X, y
+        order = np.argsort(y)
+        best = order[:self.max_points // 4]
+        rest = self.rng.choice(order[self.max_points // 4:], self.max_points - len(best), replace=False)
+        idx = np.concatenate([best, rest])
+        return X[idx], y[idx]
+
+    def fit(self, X, y, optimize=True):
+        X, y = self.subsample(X, y)
+        self.mean = y.mean()
+        self.X = X
+        y = y - self.mean
+
+        def set_theta(theta):
+            self.lengthscales = np.exp(theta[:-2])
+            self.signal, self.noise = np.exp(theta[-2:])
+
+        def nll(theta, X, y):
+            set_theta(theta)
+            K = self.kernel(X, X) + (self.noise + 1e-8) * np.eye(len(y))
+            try:
+                L = cho_factor(K, lower=True)
+            except np.linalg.LinAlgError:
+                return np.inf
+            alpha = cho_solve(L, y)
+            return 0.5 * y @ alpha + np.log(np.diag(L[0])).sum()
+
+        if optimize or not hasattr(self, "theta"):
+            idx = self.rng.permutation(len(y))[:self.fit_points]
+            theta0 = np.concatenate([np.zeros(X.shape[1]), [np.log(y.var() + 1e-6), np.log(0.1 * y.var() + 1e-6)]])
+            bounds = [(-4, 4)] * X.shape[1] + [(-8, 8)] * 2
+            self.theta = minimize(nll, theta0, args=(X[idx], y[idx]), method="L-BFGS-B", bounds=bounds).x
+        set_theta(self.theta)
+        K = self.kernel(X, X) + (self.noise + 1e-8) * np.eye(len(y))
+        self.L = cho_factor(K, lower=True)
+        self.alpha = cho_solve(self.L, y)
+        return self
+
+    def predict(self, X):
+        """
+        Return the posterior mean and standard deviation at X.
+        """
+        Ks = self.kernel(X, self.X)
+        mu = Ks @ self.alpha + self.mean
+        var = self.signal - np.sum(Ks * cho_solve(self.L, Ks.T).T, axis=1)
+        return mu, np.sqrt(np.maximum(var, 1e-12))
+
+
+def expected_improvement(mu, sigma, best):
+    """
+    Expected improvement below best (the surrogate models log runtime, lower is better).
+    """
+    z = (best - mu) / sigma
+    return (best - mu) * norm.cdf(z) + sigma * norm.pdf(z)
+
+
+def load_warm_start(sizes=(18, 19, 20)):
+    """
+    Load the grid search results as (configs, N, log runtime).
+
+    Runs that hit the time limit (return code 0) are kept at the limit they
+    reached, a lower bound on their true runtime.
+    """
+    configs, Ns, y = [], [], []
+    for N in sizes:
+        data = np.load(f"runtime_grid_search_{N}.npy", allow_pickle=True)
+        runtime = data[:, -2].astype(float)
+        ok = np.isfinite(runtime)
+        configs.append(data[ok, :len(keys)].astype(float))
+        Ns.append(np.full(ok.sum(), N))
+        y.append(np.log(runtime[ok]))
+    return np.concatenate(configs), np.concatenate(Ns), np.concatenate(y)
+
+
+def propose(gp, X, y, N, observed, batch_size, rng, num_candidates=5000):
+    """
+    Propose a batch of configurations for instance size N.
+
+    Candidates are random configurations plus neighbours of the best ones
+    observed so far. The batch is filled greedily by expected improvement with
+    the constant-liar heuristic: each pick is added to the data with its
+    predicted mean before the next one is chosen, so the batch spreads out.
+
+    Parameters:
+        gp (GaussianProcess): Surrogate fitted on (X, y).
+        X (np.array): Encoded observations.
+        y (np.array): Observed log runtimes.
+        N (int): Instance size to optimize for.
+        observed (np.array): Configurations observed so far (incumbent pool).
+        batch_size (int): Number of configurations to propose.
+        rng (np.random.Generator): Random generator.
+        num_candidates (int): Number of candidates scored per pick.
+
+    Returns:
+        np.array: (batch_size, len(keys)) configurations.
+    """
+    mu_obs, _ = gp.predict(encode(observed, N))
+    incumbents = observed[np.argsort(mu_obs)[:20]]
+    candidates = np.concatenate([sample_configs(rng, num_candidates // 2),
+                                 perturb(rng, incumbents, num_candidates - num_candidates // 2)])
+    candidates = np.unique(candidates, axis=0)
+    Xc = encode(candidates, N)
+
+    # Incumbent: the best run at this size, or the best predicted one before any run
+    at_size = X[:, -1] == encode(observed[:1], N)[0, -1]
+    best = y[at_size].min() if at_size.any() else mu_obs.min()
+
+    batch = []
+    for _ in range(batch_size):
+        mu, sigma = gp.predict(Xc)
+        pick = np.argmax(expected_improvement(mu, sigma, best))
+        batch.append(candidates[pick])
+        # Constant liar: pretend the pick was observed at its predicted mean
+        X = np.vstack([X, Xc[pick]])
+        y = np.append(y, mu[pick])
+        gp.fit(X, y, optimize=False)
+        candidates = np.delete(candidates, pick, axis=0)
+        Xc = np.delete(Xc, pick, axis=0)
+    return np.array(batch)
+
+
+def model_search(cnf, N, num_batches=10, batch_size=num_workers, time_limit=500, seed=0):
+    """
+    Sequential model-based search for fast Kissat settings on one instance.
+
+    A Gaussian process of log runtime over (parameters, instance size) is
+    warm-started with the grid search results of the smaller sizes, so the
+    first batch already exploits what was learned there. Each batch of
+    proposals is run on the worker pool and added to the data before the
+    surrogate is refitted.
+
+    Parameters:
+        cnf (str): Input CNF file.
+        N (int): Grid size of the instance (the surrogate's size input).
+        num_batches (int): Number of proposal rounds.
+        batch_size (int): Configurations per round (runs at once).
+        time_limit (int): Kissat --time limit in seconds.
+        seed (int): Random seed.
+
+    Returns:
+        list of dict: Every run, in the grid search format.
+    """
+    rng = np.random.default_rng(seed)
+    configs, Ns, y = load_warm_start()
+    X = encode(configs, Ns)
+    observed = np.unique(configs, axis=0)
+    gp = GaussianProcess(seed=seed)
+    results = []
+
+    for b in range(num_batches):
+        gp.fit(X, y)
+        batch = propose(gp, X.copy(), y.copy(), N, observed, batch_size, rng)
+        combos = [tuple(int(v) for v in config) for config in batch]
+        with ThreadPoolExecutor(max_workers=batch_size) as executor:
+            futures = [executor.submit(run_kissat, combo, time_limit, cnf) for combo in combos]
+            for f in tqdm(as_completed(futures), total=len(futures), desc=f"Batch {b}"):
+                res = f.result()
+                results.append(res)
+                if res['runtime'] is None:
+                    continue
+                config = np.array([[res[key] for key in keys]], dtype=float)
+                X = np.vstack([X, encode(config, N)])
+                y = np.append(y, math.log(max(res['runtime'], 1e-3)))
+                observed = np.vstack([observed, config])
+        solved = [res['runtime'] for res in results if res['return_code'] in (10, 20)]
+        print(f"Batch {b}: best runtime so far {min(solved) if solved else None}")
+    return results
+
+
+if __name__ == "__main__":
+    N = 21
+    results = model_search(f"lshape_{N}_3.cnf", N, num_batches=20)
+
+    df = pd.DataFrame(results, columns=keys + ['runtime', 'return_code'])
+    df.to_csv(f"runtime_model_search_{N}.csv", index=False)
+    np.save(f"runtime_model_search_{N}.npy", df.to_numpy())
+    print("Saved runtime results")
@@ -0,0 +1,207 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import bisect
+import math
+import os
+import random
+import signal
+import threading
+import time
+import pandas as pd
+import numpy as np
+from tqdm import tqdm
+from grid_search import keys, combinations, input_cnf, time_limit, num_workers, run_kissat
+
+# Kissat exit codes of a finished run
+SOLVED = (10, 20)
+
+
+def cpu_time(pid):
+    """
+    Process time (user + system, in seconds) a running process has used so far.
+
+    This is the clock of Kissat's --time limit and of its reported runtime.
+    Returns None where it cannot be read (no /proc, or the process is gone).
+    """
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # The command name in parentheses may contain spaces: split after it
+            fields = f.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    # utime and stime are fields 14 and 15 of stat(5), i.e. 12 and 13 after the name
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+class Rung:
+    """
+    One round of the race: every configuration gets the same time budget and
+    the best `keep` of them by runtime are promoted.
+
+    Every configuration is run; none is skipped. Once `keep` runs have solved
+    the instance, the keep-th best runtime is a cutoff no slower run can beat.
+    A watcher kills the process group of any run whose process time is
+    already past the cutoff. Runs started after that point get the cutoff as
+    their --time limit instead of the full budget. Runtimes, the --time limit
+    and the watcher all use Kissat's clock (process time, see cpu_time), so
+    runs slowed down in wall-clock time by sharing the CPUs are not cut early.
+    Either way such a run could not have made the cut, so the ranking is the
+    same as with every run at full budget. Where process time cannot be read
+    the watcher kills nothing and only the --time limit applies. With keep =
+    None (the last rung) nothing is cut.
+    """
+
+    def __init__(self, budget, keep, cnf, grace=1.0):
+        self.budget = budget
+        self.keep = keep
+        self.cnf = cnf
+        self.grace = grace
+        self.times = []
+        self.lock = threading.Lock()
+        self.running = set()
+        self.killed = set()
+        self.done = threading.Event()
+
+    @property
+    def solved(self):
+        return len(self.times)
+
+    def cutoff(self):
+        """
+        Runtime of the keep-th fastest solved run so far (None until keep runs have solved).
+        """
+        with self.lock:
+            if self.keep is None or len(self.times) < self.keep:
+                return None
+            return self.times[self.keep - 1]
+
+    def start(self, proc):
+        with self.lock:
+            self.running.add(proc)
+
+    def run(self, combo):
+        cutoff = self.cutoff()
+        limit = self.budget if cutoff is None else min(self.budget, math.ceil(cutoff + self.grace))
+        procs = []
+
+        def on_start(proc):
+            procs.append(proc)
+            self.start(proc)
+
+        started = time.time()
+        result = run_kissat(combo, time_limit=limit, cnf=self.cnf, on_start=on_start)
+        with self.lock:
+            for proc in procs:
+                self.running.discard(proc)
+            killed = any(proc in self.killed for proc in procs)
+            if result['return_code'] in SOLVED and not killed:
+                # Wall time is never below a single-threaded run's process time, so the fallback only loosens the cutoff
+                runtime = result['runtime'] if result['runtime'] is not None else time.time() - started
+                bisect.insort(self.times, runtime)
+            elif killed or limit < self.budget:
+                # Cut by the race: slower than the keep-th best, not a real result at this budget
+                result['runtime'] = None
+                result['pruned'] = True
+        return result
+
+    def watch(self, interval=0.5):
+        """
+        Kill the runs whose process time is already past the cutoff, until the rung is done.
+        """
+        while not self.done.wait(interval):
+            cutoff = self.cutoff()
+            if cutoff is None:
+                continue
+            with self.lock:
+                for proc in self.running:
+                    if proc.poll() is not None or proc in self.killed:
+                        continue
+                    used = cpu_time(proc.pid)
+                    if used is not None and used > cutoff + self.grace:
+                        self.killed.add(proc)
+                        try:
+                            os.killpg(proc.pid, signal.SIGTERM)
+                        except ProcessLookupError:
+                            pass
+
+
+def rank(results):
+    """
+    Order the results of a rung: solved runs by runtime first, then the rest by runtime.
+    """
+    def key(res):
+        runtime = res['runtime'] if res['runtime'] is not None else math.inf
+        return (res['return_code'] not in SOLVED, runtime)
+    return sorted(results, key=key)
+
+
+def race(configs=combinations, min_budget=10, max_budget=time_limit, eta=3, cnf=input_cnf,
+         num_workers=num_workers):
+    """
+    Successive halving over Kissat configurations.
+
+    All configurations first run with min_budget seconds. Only the best 1/eta
+    of each rung are promoted to the next one, whose budget is eta times
+    larger, until max_budget is reached; in the last rung every survivor runs
+    to completion. Every survivor of a rung is run; runs whose process time
+    is already past the keep-th best solved runtime of the rung are cut early
+    (see Rung), which cannot change who is promoted.
+
+    Parameters:
+        configs (list): Parameter combinations (tuples in param_grid order).
+        min_budget (int): Time limit of the first rung in seconds.
+        max_budget (int): Time limit of the last rung in seconds.
+        eta (int): Promotion ratio between rungs.
+        cnf (str): Input CNF file.
+        num_workers (int): Number of Kissat processes running at once.
+
+    Returns:
+        tuple: (final, log). final holds one result per configuration, from the
+        largest budget it reached, with the grid search columns; log holds
+        every run with its 'rung' and 'budget'.
+    """
+    num_rungs = max(1, math.floor(math.log(max_budget / min_budget, eta)) + 1)
+    budgets = [max_budget / eta ** (num_rungs - 1 - r) for r in range(num_rungs)]
+    survivors = list(configs)
+    final = {}
+    log = []
+
+    for r, budget in enumerate(budgets):
+        last = r == num_rungs - 1
+        keep = None if last else max(1, math.ceil(len(survivors) / eta))
+        rung = Rung(math.ceil(budget), keep, cnf)
+        watcher = threading.Thread(target=rung.watch, daemon=True)
+        watcher.start()
+        results = []
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            futures = [executor.submit(rung.run, combo) for combo in survivors]
+            for f in tqdm(as_completed(futures), total=len(futures), desc=f"Rung {r} ({rung.budget}s)"):
+                results.append(f.result())
+        rung.done.set()
+        watcher.join()
+
+        for res in results:
+            combo = tuple(res[key] for key in keys)
+            if res['runtime'] is not None or combo not in final:
+                final[combo] = res
+            log.append({**res, 'rung': r, 'budget': rung.budget})
+        ranked = rank(results)
+        print(f"Rung {r}: {len(survivors)} configurations, {rung.solved} solved within {rung.budget}s")
+        if last:
+            break
+        survivors = [tuple(res[key] for key in keys) for res in ranked[:keep]]
+
+    return list(final.values()), log
+
+
+if __name__ == "__main__":
+    # Race a random sample of the full factorial, or all of it with sample = None
+    sample = None
+    configs = combinations if sample is None else random.Random(0).sample(combinations, sample)
+    final, log = race(configs, min_budget=10, max_budget=time_limit, eta=3)
+
+    # Same layout as grid_search.py: parameters, runtime, return code
+    df = pd.DataFrame(final, columns=keys + ['runtime', 'return_code'])
+    df.to_csv("runtime_race_20.csv", index=False)
+    np.save("runtime_race_20.npy", df.to_numpy())
+    pd.DataFrame(log).to_csv("race_log_20.csv", index=False)
+    print("Saved runtime results")
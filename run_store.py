@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import pandas as pd
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    instance TEXT NOT NULL,
+    params TEXT NOT NULL,
+    time_limit REAL NOT NULL,
+    cnf TEXT,
+    runtime REAL,
+    return_code INTEGER,
+    stats TEXT,
+    finished REAL,
+    PRIMARY KEY (instance, params, time_limit)
+)
+"""
+
+
+def instance_hash(filename, chunk_size=1 << 24):
+    """
+    SHA-256 of a CNF file's contents, so a run is tied to the formula and not to its filename.
+    """
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def params_key(params):
+    """
+    Canonical text form of a parameter set (sorted keys, so the order of param_grid does not matter).
+    """
+    return json.dumps(params, sort_keys=True)
+
+
+class RunStore:
+    """
+    SQLite store of solver runs, keyed by instance hash, parameter set and time limit.
+
+    Every result is committed as soon as it is recorded, so a killed job loses
+    at most the runs that were still in flight, and a restarted job can skip
+    every combination already in the store. The database is opened in WAL mode
+    so that a notebook can query it while a search is writing to it.
+
+    Usage:
+        store = RunStore("runs.sqlite")
+        instance = store.instance("lshape_20_3.cnf")
+        todo = [params for params in all_params if not store.has(instance, params, 500)]
+        store.record(instance, params, 500, runtime=12.3, return_code=10, stats={...})
+        df = store.to_dataframe()
+    """
+
+    def __init__(self, path="runs.sqlite"):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(SCHEMA)
+        self.conn.commit()
+        self._hashes = {}
+
+    def instance(self, cnf):
+        """
+        Return the hash of a CNF file, cached per (path, size, mtime).
+        """
+        st = os.stat(cnf)
+        key = (os.path.abspath(cnf), st.st_size, st.st_mtime)
+        if key not in self._hashes:
+            self._hashes[key] = instance_hash(cnf)
+        return self._hashes[key]
+
+    def finished(self, instance, time_limit):
+        """
+        Return the parameter keys (see params_key) already run on an instance with a time limit.
+        """
+        rows = self.conn.execute("SELECT params FROM runs WHERE instance = ? AND time_limit = ?",
+                                 (instance, time_limit))
+        return {params for (params,) in rows}
+
+    def has(self, instance, params, time_limit):
+        row = self.conn.execute("SELECT 1 FROM runs WHERE instance = ? AND params = ? AND time_limit = ?",
+                                (instance, params_key(params), time_limit)).fetchone()
+        return row is not None
+
+    def record(self, instance, params, time_limit, runtime, return_code, stats=None, cnf=None):
+        """
+        Insert (or replace) one run and commit it immediately.
+
+        Parameters:
+            instance (str): Instance hash.
+            params (dict): Solver parameters of the run.
+            time_limit (float): Time limit the run was given.
+            runtime (float): Runtime in seconds (None if not reported).
+            return_code (int): Solver exit code.
+            stats (dict): Optional parsed solver statistics, stored as JSON.
+            cnf (str): Optional CNF filename, for reference only.
+        """
+        self.conn.execute("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                          (instance, params_key(params), time_limit, cnf, runtime, return_code,
+                           json.dumps(stats) if stats is not None else None, time.time()))
+        self.conn.commit()
+
+    def to_dataframe(self, instance=None, expand=True):
+        """
+        Load the runs as a DataFrame, optionally for one instance only.
+
+        With expand, every parameter and every statistic gets its own column
+        (statistics prefixed with "stats."), ready for the notebook analysis.
+        """
+        query = "SELECT * FROM runs"
+        args = ()
+        if instance is not None:
+            query += " WHERE instance = ?"
+            args = (instance,)
+        df = pd.read_sql_query(query, self.conn, params=args)
+        if not expand or df.empty:
+            return df
+        params = pd.DataFrame([json.loads(p) for p in df["params"]], index=df.index)
+        stats = pd.DataFrame([json.loads(s) if s else {} for s in df["stats"]], index=df.index)
+        stats.columns = [f"stats.{col}" for col in stats.columns]
+        return pd.concat([params, df.drop(columns=["params", "stats"]), stats], axis=1)
+
+    def close(self):
+        self.conn.close()
@@ -1,3 +1,5 @@
+import numpy as np
+
 def decode_var(v, r):
     """Returns the integer and color class for variable v."""
     i = (v - 1) // r + 1
@@ -9,15 +11,40 @@ def decode_result(result, r):
     Decode the result of a SAT solver into a list of clauses.
 
     Parameters:
-        result (str): The result of a SAT solver.
+        result (str or array): The result of a SAT solver, as a string or an array of literals.
+        r (int): Number of colors.
+
+    Returns:
+        list: A list of (integer, color) pairs, one per positive literal.
+    """
+    if isinstance(result, str):
+        result = result.split()
+    lits = np.asarray(result, dtype=np.int64)
+    lits = lits[lits > 0]
+    i, j = decode_var(lits, r)
+    return list(zip(i.tolist(), j.tolist()))
+
+def decode_colorings(results, n, r):
+    """
+    Decode one or many SAT models into color arrays in one vectorized step.
+
+    Parameters:
+        results (array): Literals of one model, or a (B, L) array of models
+            (e.g. every model of an enumeration, padded with zeros).
+        n (int): Number of integers.
         r (int): Number of colors.
 
     Returns:
-        list: A list of clauses.
+        np.array: Colors 1..r of the integers 1..n, with shape (n,) or (B, n);
+            0 where a model sets no color (the smallest color where it sets several).
     """
-    clauses = []
-    for line in result.split(" "):
-        if int(line) > 0:
-            clause = decode_var(int(line), r)
-            clauses.append(clause)
-    return clauses
\ No newline at end of file
+    lits = np.asarray(results, dtype=np.int64)
+    single = lits.ndim == 1
+    lits = np.atleast_2d(lits)
+    values = np.zeros((len(lits), n * r + 1), dtype=bool)
+    rows = np.broadcast_to(np.arange(len(lits))[:, None], lits.shape)
+    keep = (lits > 0) & (lits <= n * r)
+    values[rows[keep], lits[keep]] = True
+    values = values[:, 1:].reshape(-1, n, r)
+    colors = np.where(values.any(axis=-1), values.argmax(axis=-1) + 1, 0)
+    return colors[0] if single else colors
@@ -8,4 +8,4 @@ eval "$(conda shell.bash hook)"
 conda activate thesis
 
 cd /home/DAVIDSON/mili/Senior-Thesis
-python vdw_to_cnf.py
\ No newline at end of file
+python -m vdw.vdw_to_cnf
\ No newline at end of file